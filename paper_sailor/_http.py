@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import base64
+import http.client
+import threading
+import time
+import urllib.parse
+import urllib.request
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5  # seconds; doubled after every retry
+MAX_REDIRECTS = 5
+_REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+
+# Idle keep-alive connections keyed by (scheme, netloc, proxy); reused across calls and threads
+_POOL: Dict[Tuple[str, str, str], List[http.client.HTTPConnection]] = {}
+_POOL_LOCK = threading.Lock()
+MAX_IDLE_PER_HOST = 16
+
+
+@dataclass
+class Response:
+    status: int
+    reason: str
+    headers: http.client.HTTPMessage
+    body: bytes
+
+
+def _proxy_for(scheme: str, netloc: str) -> str:
+    """Proxy URL for a request to ``netloc`` from the environment (as urllib resolves it), or ""."""
+    proxy = urllib.request.getproxies().get(scheme, "")
+    if not proxy or urllib.request.proxy_bypass(netloc.rpartition("@")[2]):
+        return ""
+    return proxy if "://" in proxy else f"http://{proxy}"
+
+
+def _proxy_headers(proxy: str) -> Dict[str, str]:
+    parts = urllib.parse.urlsplit(proxy)
+    if parts.username is None:
+        return {}
+    userpass = f"{urllib.parse.unquote(parts.username)}:{urllib.parse.unquote(parts.password or '')}"
+    return {"Proxy-Authorization": "Basic " + base64.b64encode(userpass.encode("utf-8")).decode("ascii")}
+
+
+def _acquire(key: Tuple[str, str, str], timeout: float) -> http.client.HTTPConnection:
+    with _POOL_LOCK:
+        idle = _POOL.get(key)
+        conn = idle.pop() if idle else None
+    if conn is None:
+        return _connect(key, timeout)
+    conn.timeout = timeout
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout)
+    return conn
+
+
+def _connect(key: Tuple[str, str, str], timeout: float) -> http.client.HTTPConnection:
+    scheme, netloc, proxy = key
+    cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+    if not proxy:
+        return cls(netloc, timeout=timeout)
+    # HTTPS goes through a CONNECT tunnel; plain HTTP is sent to the proxy with an absolute URL
+    proxy_parts = urllib.parse.urlsplit(proxy)
+    default_port = 443 if proxy_parts.scheme == "https" else 80
+    conn = cls(proxy_parts.hostname, proxy_parts.port or default_port, timeout=timeout)
+    if scheme == "https":
+        conn.set_tunnel(netloc.rpartition("@")[2], headers=_proxy_headers(proxy))
+    return conn
+
+
+def _release(key: Tuple[str, str, str], conn: http.client.HTTPConnection) -> None:
+    with _POOL_LOCK:
+        idle = _POOL.setdefault(key, [])
+        if len(idle) < MAX_IDLE_PER_HOST:
+            idle.append(conn)
+            return
+    conn.close()
+
+
+def _open(
+    method: str, url: str, data: Optional[bytes], headers: Dict[str, str], timeout: float
+) -> Tuple[Tuple[str, str, str], http.client.HTTPConnection, http.client.HTTPResponse]:
+    """Send one request over a pooled keep-alive connection; the body is left unread.
+
+    Honours HTTP(S)_PROXY / NO_PROXY like ``urllib.request.urlopen``.
+    """
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        raise ValueError(f"Unsupported URL scheme: {url}")
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+    key = (parts.scheme, parts.netloc, _proxy_for(parts.scheme, parts.netloc))
+    if key[2] and parts.scheme == "http":
+        path = f"http://{parts.netloc}{path}"
+        headers = {**_proxy_headers(key[2]), **headers}
+    while True:
+        conn = _acquire(key, timeout)
+        reused = conn.sock is not None
+        try:
+            conn.request(method, path, body=data, headers=headers)
+            return key, conn, conn.getresponse()
+        except ConnectionError:
+            conn.close()
+            if reused:
+                continue  # server dropped an idle connection; retry on a fresh one
+            raise
+        except Exception:
+            conn.close()
+            raise
+
+
+def _finish(key: Tuple[str, str, str], conn: http.client.HTTPConnection, resp: http.client.HTTPResponse) -> None:
+    """Pool ``conn`` again if ``resp`` was read to the end and the server keeps it alive."""
+    if resp.isclosed() and not resp.will_close:
+        _release(key, conn)
+    else:
+        conn.close()
+
+
+def _send(method: str, url: str, data: Optional[bytes], headers: Dict[str, str], timeout: float) -> Response:
+    """One request over a pooled keep-alive connection; the body is read in full."""
+    key, conn, resp = _open(method, url, data, headers, timeout)
+    try:
+        body = resp.read()
+    except Exception:
+        conn.close()
+        raise
+    _finish(key, conn, resp)
+    return Response(resp.status, resp.reason, resp.headers, body)
+
+
+def _retry_delay(resp: Response, attempt: int) -> float:
+    retry_after = resp.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return float(retry_after)
+    return BACKOFF_FACTOR * (2 ** attempt)
+
+
+def request(
+    method: str,
+    url: str,
+    *,
+    data: Optional[bytes] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 30.0,
+    retries: int = MAX_RETRIES,
+) -> Response:
+    """Send ``method url`` through the shared connection pool.
+
+    Follows redirects and retries 429/5xx responses with exponential backoff (honouring
+    a numeric Retry-After). Error statuses are returned, not raised; transport failures
+    raise ``OSError`` / ``http.client.HTTPException``.
+    """
+    headers = headers or {}
+    attempt = 0
+    redirects = 0
+    while True:
+        resp = _send(method, url, data, headers, timeout)
+        if resp.status in _REDIRECT_STATUSES and redirects < MAX_REDIRECTS:
+            location = resp.headers.get("Location")
+            if location:
+                url = urllib.parse.urljoin(url, location)
+                redirects += 1
+                if resp.status == 303:
+                    method, data = "GET", None
+                continue
+        if resp.status in RETRY_STATUSES and attempt < retries:
+            time.sleep(_retry_delay(resp, attempt))
+            attempt += 1
+            continue
+        return resp
+
+
+@contextmanager
+def stream(
+    url: str,
+    *,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 30.0,
+    retries: int = MAX_RETRIES,
+) -> Iterator[http.client.HTTPResponse]:
+    """GET ``url`` and yield the unread response so large bodies can be copied in chunks.
+
+    Redirects and retries behave as in :func:`request`. The connection goes back to the
+    pool only if the caller reads the body to the end.
+    """
+    headers = headers or {}
+    attempt = 0
+    redirects = 0
+    while True:
+        key, conn, resp = _open("GET", url, None, headers, timeout)
+        location = resp.getheader("Location") if resp.status in _REDIRECT_STATUSES else None
+        if location and redirects < MAX_REDIRECTS:
+            url = urllib.parse.urljoin(url, location)
+            redirects += 1
+            delay = 0.0
+        elif resp.status in RETRY_STATUSES and attempt < retries:
+            delay = _retry_delay(Response(resp.status, resp.reason, resp.headers, b""), attempt)
+            attempt += 1
+        else:
+            try:
+                yield resp
+            finally:
+                _finish(key, conn, resp)
+            return
+        try:
+            resp.read()  # drain the small redirect/error body so the connection can be reused
+        except Exception:
+            conn.close()
+        else:
+            _finish(key, conn, resp)
+        if delay:
+            time.sleep(delay)
+
+
+def get(url: str, *, headers: Optional[Dict[str, str]] = None, timeout: float = 30.0) -> Response:
+    return request("GET", url, headers=headers, timeout=timeout)
+
+
+def post(url: str, data: bytes, *, headers: Optional[Dict[str, str]] = None, timeout: float = 30.0) -> Response:
+    return request("POST", url, data=data, headers=headers, timeout=timeout)
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:  # Optional dependency
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional import
+    orjson = None  # type: ignore
+
+
+def dumps(obj: Any, *, indent: bool = False) -> bytes:
+    """UTF-8 JSON for ``obj``; non-str keys and numpy values are accepted when orjson is installed."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """Parse JSON from ``bytes`` or ``str``; orjson.JSONDecodeError subclasses json.JSONDecodeError."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
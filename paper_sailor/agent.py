@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import os
 import time
-from typing import Any, Dict, Iterable, List
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
 from .storage import (
+    chunks_path,
     ensure_dirs,
     json_write,
-    jsonl_append,
+    jsonl_append_many,
+    jsonl_read,
     papers_jsonl,
     pdf_path,
     session_path,
@@ -16,7 +21,7 @@ from .tools import (
     discover_pdf_url,
     download_file,
     fetch_html,
-    keyword_retrieve,
+    KeywordIndex,
     parse_pdf_text,
     search_arxiv,
     vector_retrieve,
@@ -30,106 +35,184 @@ DEFAULT_QUESTIONS = [
     "What datasets and metrics are common?",
 ]
 
+EMBED_BATCH_SIZE = 256
+EMBED_CONCURRENCY = 8
 
-def _batched(seq: List[Any], size: int) -> Iterable[List[Any]]:
-    for i in range(0, len(seq), size):
-        yield seq[i : i + size]
+
+def _iter_chunks(paths: Iterable[Path]) -> Iterator[Dict[str, Any]]:
+    for path in paths:
+        yield from jsonl_read(path)
+
+
+def _embed_and_store(session_id: str, chunks: List[Dict[str, Any]], store: VectorStore) -> None:
+    """Embed one batch of chunks and upsert it; runs in the embedding pool."""
+    from .tools import embed_texts  # Imported lazily to avoid circular deps
+
+    # Embed each distinct text once; shared boilerplate reuses the same vector, and
+    # embed_texts serves texts seen in earlier sessions from its disk cache
+    texts = [t for t in dict.fromkeys(c.get("text") or "" for c in chunks) if t.strip()]
+    if not texts:
+        return
+    vectors = dict(zip(texts, embed_texts(texts)))
+    records = []
+    for chunk in chunks:
+        emb = vectors.get(chunk.get("text") or "")
+        if emb is None:
+            continue
+        records.append(
+            {
+                "chunk_id": chunk["id"],
+                "paper_id": chunk.get("paper_id"),
+                "text": chunk.get("text"),
+                "embedding": emb,
+                "metadata": {
+                    "section": chunk.get("section"),
+                    "page_from": chunk.get("page_from"),
+                    "page_to": chunk.get("page_to"),
+                },
+            }
+        )
+    store.upsert(session_id, records)
+
+
+def _process_paper(paper: Dict[str, Any]) -> Tuple[str, List[Dict[str, Any]]]:
+    """Download, parse and chunk a single paper; safe to run in a worker thread."""
+    paper_id = paper["id"]
+    pdf_local = None
+
+    pdf_url = paper.get("pdf_url")
+    if pdf_url:
+        pdf_local = download_file(pdf_url, paper_id=paper_id, kind="pdf")
+
+    if not pdf_local:
+        html = fetch_html(paper.get("url") or "") if paper.get("url") else None
+        if html:
+            alt_pdf = discover_pdf_url(html, paper.get("url") or "")
+            if alt_pdf:
+                pdf_local = download_file(alt_pdf, paper_id=paper_id, kind="pdf")
+
+    pdf_path_str = str(pdf_path(paper_id))
+    local_chunks: List[Dict[str, Any]] = []
+    try:
+        local_chunks = parse_pdf_text(pdf_path_str, paper_id=paper_id)
+    except Exception:
+        local_chunks = []
+
+    if not local_chunks and paper.get("summary"):
+        local_chunks = [
+            {
+                "id": f"{paper_id}:summary",
+                "paper_id": paper_id,
+                "section": "Summary",
+                "page_from": 0,
+                "page_to": 0,
+                "text": paper["summary"],
+            }
+        ]
+
+    if local_chunks:
+        # Each paper writes its own chunk file, so no cross-thread locking is needed
+        write_chunks(paper_id, local_chunks)
+    return paper_id, local_chunks
+
+
+def _build_note(
+    topic: str,
+    session_id: str,
+    paper_ids: List[str],
+    questions: List[str],
+    findings: List[Dict[str, Any]],
+    warnings: List[str],
+) -> Dict[str, Any]:
+    ideas = [
+        {
+            "title": "Idea 1: Improve retrieval with domain lexicon",
+            "motivation": "Summaries indicate terminology drift; a controlled vocabulary can help.",
+            "method": "Curate domain terms → expand queries → re-rank.",
+            "eval": "Measure coverage and citation accuracy on held-out papers.",
+            "risks": "Limited generalization; maintenance cost.",
+            "refs": paper_ids[:3],
+        },
+        {
+            "title": "Idea 2: Evidence-linked summarization",
+            "motivation": "Ensure every claim links to a page/section.",
+            "method": "Chunk retrieval → claim extraction → cite with coordinates.",
+            "eval": "Human judge citation correctness; automate overlap metrics.",
+            "risks": "PDF parsing noise; OCR issues.",
+            "refs": paper_ids[:3],
+        },
+    ]
+
+    note = {
+        "topic": topic,
+        "session_id": session_id,
+        "created_at": int(time.time()),
+        "papers": paper_ids,
+        "questions": questions,
+        "findings": findings,
+        "ideas": ideas,
+        "reading_list": [{"paper_id": pid, "reason": "From arXiv search"} for pid in paper_ids[:10]],
+    }
+    if warnings:
+        note["warnings"] = warnings
+    return note
 
 
 def run_session(topic: str, session_id: str, max_papers: int = 10) -> Dict[str, Any]:
     """Search, fetch, chunk, index, and draft structured notes for a session."""
     ensure_dirs()
-    vector_store = VectorStore()
-    vector_store.delete_session(session_id)
-
     try:
         papers = search_arxiv(topic, max_results=max_papers)
-    except Exception:
+    except Exception as exc:
         papers = []
+        search_warning = f"search_failed:{exc}"
+    else:
+        search_warning = "no_papers_found"
 
-    paper_ids: List[str] = []
-    for p in papers:
-        paper_ids.append(p["id"])
-        jsonl_append(papers_jsonl(), p)
-
-    all_chunks: List[Dict[str, Any]] = []
-    for paper in papers:
-        paper_id = paper["id"]
-        pdf_local = None
-
-        pdf_url = paper.get("pdf_url")
-        if pdf_url:
-            pdf_local = download_file(pdf_url, paper_id=paper_id, kind="pdf")
-
-        if not pdf_local:
-            html = fetch_html(paper.get("url") or "") if paper.get("url") else None
-            if html:
-                alt_pdf = discover_pdf_url(html, paper.get("url") or "")
-                if alt_pdf:
-                    pdf_local = download_file(alt_pdf, paper_id=paper_id, kind="pdf")
-
-        pdf_path_str = str(pdf_path(paper_id))
-        local_chunks: List[Dict[str, Any]] = []
-        try:
-            local_chunks = parse_pdf_text(pdf_path_str, paper_id=paper_id)
-        except Exception:
-            local_chunks = []
+    # Drop vectors from any earlier run of this session id, even if this run finds nothing
+    vector_store = VectorStore()
+    vector_store.delete_session(session_id)
 
-        if not local_chunks and paper.get("summary"):
-            local_chunks = [
-                {
-                    "id": f"{paper_id}:summary",
-                    "paper_id": paper_id,
-                    "section": "Summary",
-                    "page_from": 0,
-                    "page_to": 0,
-                    "text": paper["summary"],
-                }
-            ]
+    if not papers:
+        # Nothing to fetch, index or cite
+        note = _build_note(topic, session_id, [], DEFAULT_QUESTIONS, [], [search_warning])
+        json_write(session_path(session_id), note)
+        return note
 
-        if local_chunks:
-            write_chunks(paper_id, local_chunks)
-            for chunk in local_chunks:
-                all_chunks.append(chunk)
+    paper_ids: List[str] = [p["id"] for p in papers]
+    jsonl_append_many(papers_jsonl(), papers)
 
-    # Build vector index from chunks
+    # Chunks are handed to the embedding pool as soon as each paper is parsed
+    # instead of being collected for the whole session first.
     embedding_errors: List[str] = []
-    from .tools import embed_texts  # Imported lazily to avoid circular deps
-
-    embedding_failed = False
-
-    for batch in _batched(all_chunks, 32):
-        if embedding_failed:
-            break
-        texts = [c.get("text", "") for c in batch]
-        try:
-            embeddings = embed_texts(texts)
-        except Exception as exc:
-            embedding_errors.append(str(exc))
-            embeddings = []
-            embedding_failed = True
-        if not embeddings:
-            continue
-        records = []
-        for chunk, emb in zip(batch, embeddings):
-            records.append(
-                {
-                    "chunk_id": chunk["id"],
-                    "paper_id": chunk.get("paper_id"),
-                    "text": chunk.get("text"),
-                    "embedding": emb,
-                    "metadata": {
-                        "section": chunk.get("section"),
-                        "page_from": chunk.get("page_from"),
-                        "page_to": chunk.get("page_to"),
-                    },
-                }
-            )
-        vector_store.upsert(session_id, records)
+    chunk_files: List[Path] = []
+    futures = []
+    workers = min(len(papers), (os.cpu_count() or 1) * 2)
+    with ThreadPoolExecutor(max_workers=workers) as paper_pool, ThreadPoolExecutor(
+        max_workers=EMBED_CONCURRENCY
+    ) as embed_pool:
+        pending: List[Dict[str, Any]] = []
+        # map() yields in submission order, so chunk files follow search order
+        for paper_id, local_chunks in paper_pool.map(_process_paper, papers):
+            if not local_chunks:
+                continue
+            chunk_files.append(chunks_path(paper_id))
+            pending.extend(local_chunks)
+            if len(pending) >= EMBED_BATCH_SIZE:
+                futures.append(embed_pool.submit(_embed_and_store, session_id, pending, vector_store))
+                pending = []
+        if pending:
+            futures.append(embed_pool.submit(_embed_and_store, session_id, pending, vector_store))
+        for future in futures:
+            try:
+                future.result()
+            except Exception as exc:
+                embedding_errors.append(str(exc))
 
     # Draft findings using vector store with keyword fallback
     questions = DEFAULT_QUESTIONS
     findings = []
+    keyword_index = None  # built on first fallback, then shared by later questions
 
     for question in questions:
         vector_hits: List[Dict[str, Any]] = []
@@ -150,7 +233,9 @@ def run_session(topic: str, session_id: str, max_papers: int = 10) -> Dict[str,
                 for hit in vector_hits
             ]
         else:
-            fallback_chunks = keyword_retrieve(all_chunks, question, top_n=3)
+            if keyword_index is None:
+                keyword_index = KeywordIndex(_iter_chunks(chunk_files))
+            fallback_chunks = keyword_index.query(question, top_n=3)
             citations = [
                 {
                     "paper_id": ch.get("paper_id"),
@@ -170,36 +255,6 @@ def run_session(topic: str, session_id: str, max_papers: int = 10) -> Dict[str,
             }
         )
 
-    ideas = [
-        {
-            "title": "Idea 1: Improve retrieval with domain lexicon",
-            "motivation": "Summaries indicate terminology drift; a controlled vocabulary can help.",
-            "method": "Curate domain terms → expand queries → re-rank.",
-            "eval": "Measure coverage and citation accuracy on held-out papers.",
-            "risks": "Limited generalization; maintenance cost.",
-            "refs": paper_ids[:3],
-        },
-        {
-            "title": "Idea 2: Evidence-linked summarization",
-            "motivation": "Ensure every claim links to a page/section.",
-            "method": "Chunk retrieval → claim extraction → cite with coordinates.",
-            "eval": "Human judge citation correctness; automate overlap metrics.",
-            "risks": "PDF parsing noise; OCR issues.",
-            "refs": paper_ids[:3],
-        },
-    ]
-
-    note = {
-        "topic": topic,
-        "session_id": session_id,
-        "created_at": int(time.time()),
-        "papers": paper_ids,
-        "questions": questions,
-        "findings": findings,
-        "ideas": ideas,
-        "reading_list": [{"paper_id": pid, "reason": "From arXiv search"} for pid in paper_ids[:10]],
-    }
-    if embedding_errors:
-        note["warnings"] = embedding_errors
+    note = _build_note(topic, session_id, paper_ids, questions, findings, embedding_errors)
     json_write(session_path(session_id), note)
     return note
@@ -3,8 +3,10 @@ from __future__ import annotations
 import json
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
 
 
 try:  # Python 3.11+
@@ -21,14 +23,18 @@ class OpenAISettings:
     api_key: Optional[str]
     base_url: str
     embedding_model: str
+    embedding_dimensions: Optional[int]
     chat_model: str
     timeout: float
     extra_headers: Dict[str, str]
+    chat_endpoint: str
+    embeddings_endpoint: str
 
 
 _OPENAI_CACHE: Optional[OpenAISettings] = None
 _MEM0_CACHE = None  # type: ignore[assignment]
 _VISION_CACHE = None  # type: ignore[assignment]
+_RETRIEVAL_CACHE = None  # type: ignore[assignment]
 
 
 @dataclass(frozen=True)
@@ -44,20 +50,29 @@ class VisionSettings:
     max_tokens: int
 
 
-def _load_local_config() -> Dict:
+@dataclass(frozen=True)
+class RetrievalSettings:
+    high_precision: bool
+
+
+@lru_cache(maxsize=1)
+def _load_local_config() -> Mapping[str, Any]:
+    """Parse config.toml/config.json once per process; the result is read-only."""
     paths = [ROOT / "config.toml", ROOT / "config.json"]
     for path in paths:
-        if not path.exists():
+        try:
+            f = path.open("rb")
+        except FileNotFoundError:
             continue
-        if path.suffix == ".toml":
-            if not tomllib:
-                raise RuntimeError("tomllib not available; install tomli or use config.json")
-            with path.open("rb") as f:
-                return tomllib.load(f)
-        if path.suffix == ".json":
-            with path.open("r", encoding="utf-8") as f:
-                return json.load(f)
-    return {}
+        with f:
+            if path.suffix == ".toml":
+                if not tomllib:
+                    raise RuntimeError("tomllib not available; install tomli or use config.json")
+                data = tomllib.load(f)
+            else:
+                data = json.load(f)
+        return MappingProxyType(data) if isinstance(data, dict) else MappingProxyType({})
+    return MappingProxyType({})
 
 
 def get_openai_settings() -> OpenAISettings:
@@ -66,12 +81,17 @@ def get_openai_settings() -> OpenAISettings:
         return _OPENAI_CACHE
 
     data = _load_local_config()
-    section = data.get("openai", {}) if isinstance(data, dict) else {}
+    section = data.get("openai", {}) if isinstance(data, Mapping) else {}
 
     api_key = os.getenv("OPENAI_API_KEY") or section.get("api_key")
     base_url = os.getenv("OPENAI_BASE_URL") or section.get("base_url") or "https://api.openai.com/v1"
     base_url = base_url.rstrip("/")
     embed_model = os.getenv("OPENAI_EMBED_MODEL") or section.get("embedding_model") or "text-embedding-3-small"
+    dims_raw = os.getenv("OPENAI_EMBED_DIMENSIONS") or section.get("embedding_dimensions")
+    try:
+        embed_dims = int(dims_raw) if dims_raw else None
+    except (TypeError, ValueError):
+        embed_dims = None
     chat_model = os.getenv("OPENAI_MODEL") or section.get("model") or "gpt-4o-mini"
     timeout_raw = os.getenv("OPENAI_TIMEOUT") or section.get("timeout") or 30
     try:
@@ -91,9 +111,12 @@ def get_openai_settings() -> OpenAISettings:
         api_key=api_key,
         base_url=base_url,
         embedding_model=embed_model,
+        embedding_dimensions=embed_dims,
         chat_model=chat_model,
         timeout=timeout,
         extra_headers=extra_headers,
+        chat_endpoint=f"{base_url}/chat/completions",
+        embeddings_endpoint=f"{base_url}/embeddings",
     )
     return _OPENAI_CACHE
 
@@ -104,7 +127,7 @@ def get_mem0_settings() -> MEM0Settings:
         return _MEM0_CACHE  # type: ignore[return-value]
 
     data = _load_local_config()
-    section = data.get("mem0", {}) if isinstance(data, dict) else {}
+    section = data.get("mem0", {}) if isinstance(data, Mapping) else {}
 
     api_key = os.getenv("MEM0_API_KEY") or section.get("api_key")
     base_url = os.getenv("MEM0_BASE_URL") or section.get("base_url") or "https://api.mem0.ai/v1"
@@ -125,7 +148,7 @@ def get_vision_settings() -> VisionSettings:
         return _VISION_CACHE  # type: ignore[return-value]
 
     data = _load_local_config()
-    section = data.get("openai", {}) if isinstance(data, dict) else {}
+    section = data.get("openai", {}) if isinstance(data, Mapping) else {}
 
     model = os.getenv("OPENAI_VISION_MODEL") or section.get("vision_model") or "gpt-4o"
     max_tokens_raw = os.getenv("OPENAI_VISION_MAX_TOKENS") or section.get("max_vision_tokens") or 4096
@@ -139,3 +162,20 @@ def get_vision_settings() -> VisionSettings:
         max_tokens=max_tokens,
     )
     return _VISION_CACHE  # type: ignore[return-value]
+
+
+def get_retrieval_settings() -> RetrievalSettings:
+    global _RETRIEVAL_CACHE
+    if _RETRIEVAL_CACHE is not None:
+        return _RETRIEVAL_CACHE  # type: ignore[return-value]
+
+    data = _load_local_config()
+    section = data.get("retrieval", {}) if isinstance(data, Mapping) else {}
+
+    high_precision_raw = os.getenv("PAPER_SAILOR_HIGH_PRECISION") or section.get("high_precision") or False
+    high_precision = str(high_precision_raw).strip().lower() in ("1", "true", "yes", "on")
+
+    _RETRIEVAL_CACHE = RetrievalSettings(
+        high_precision=high_precision,
+    )
+    return _RETRIEVAL_CACHE  # type: ignore[return-value]
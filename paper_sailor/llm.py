@@ -1,37 +1,56 @@
 from __future__ import annotations
 
-import json
-import urllib.error
-import urllib.request
-from typing import Any, Dict, Iterable, List, Optional
+import http.client
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from .config import get_openai_settings
+from . import _http, _jsonio
+from .config import OpenAISettings, get_openai_settings
 
 
 USER_AGENT = "paper-sailor/0.3"
 
+# Key order of every chat payload; optional keys are appended per call
+_BASE_PAYLOAD: Dict[str, Any] = {"model": None, "messages": None, "temperature": 0.2}
+_HEADERS: Optional[Tuple[OpenAISettings, Dict[str, str]]] = None
+
+
+def _request_headers(settings: OpenAISettings) -> Dict[str, str]:
+    """Static request headers, built once per settings object and shared read-only."""
+    global _HEADERS
+    if _HEADERS is None or _HEADERS[0] is not settings:
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {settings.api_key}",
+            "User-Agent": USER_AGENT,
+        }
+        headers.update(settings.extra_headers)
+        _HEADERS = (settings, headers)
+    return _HEADERS[1]
+
+
+def _stringify(content: Any) -> str:
+    if isinstance(content, list):
+        pieces: List[str] = []
+        for part in content:
+            if isinstance(part, dict) and "text" in part:
+                pieces.append(str(part["text"]))
+            elif isinstance(part, dict) and "content" in part:
+                pieces.append(str(part["content"]))
+            else:
+                pieces.append(str(part))
+        return "\n".join(pieces)
+    return _jsonio.dumps(content).decode("utf-8")
+
 
 def _normalize_messages(messages: Iterable[Dict[str, Any]]) -> List[Dict[str, str]]:
-    norm: List[Dict[str, str]] = []
-    for msg in messages:
-        role = msg.get("role") or msg.get("type") or "user"
-        content = msg.get("content", "")
-        if isinstance(content, str):
-            text = content
-        elif isinstance(content, list):
-            pieces: List[str] = []
-            for part in content:
-                if isinstance(part, dict) and "text" in part:
-                    pieces.append(str(part["text"]))
-                elif isinstance(part, dict) and "content" in part:
-                    pieces.append(str(part["content"]))
-                else:
-                    pieces.append(str(part))
-            text = "\n".join(pieces)
-        else:
-            text = json.dumps(content, ensure_ascii=False)
-        norm.append({"role": role, "content": text})
-    return norm
+    # Plain string content is by far the common case; only other shapes go through _stringify
+    return [
+        {
+            "role": msg.get("role") or msg.get("type") or "user",
+            "content": content if isinstance(content := msg.get("content", ""), str) else _stringify(content),
+        }
+        for msg in messages
+    ]
 
 
 def call_llm(
@@ -46,12 +65,11 @@ def call_llm(
     if not settings.api_key:
         raise RuntimeError("OpenAI API key missing; set OPENAI_API_KEY or configure config.toml")
 
-    target = settings.base_url.rstrip("/") + "/chat/completions"
-    payload: Dict[str, Any] = {
-        "model": settings.chat_model,
-        "messages": _normalize_messages(messages),
-        "temperature": temperature,
-    }
+    target = settings.chat_endpoint
+    payload = _BASE_PAYLOAD.copy()
+    payload["model"] = settings.chat_model
+    payload["messages"] = _normalize_messages(messages)
+    payload["temperature"] = temperature
     if tools:
         payload["tools"] = tools
     if response_format:
@@ -59,26 +77,19 @@ def call_llm(
     if max_output_tokens is not None:
         payload["max_tokens"] = max_output_tokens
 
-    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {settings.api_key}",
-        "User-Agent": USER_AGENT,
-    }
-    headers.update(settings.extra_headers)
+    data = _jsonio.dumps(payload)
+    headers = _request_headers(settings)
 
-    req = urllib.request.Request(target, data=data, headers=headers)
     timeout = max(float(settings.timeout or 0), 60.0)
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            body = resp.read()
-    except urllib.error.HTTPError as exc:
-        detail = exc.read().decode("utf-8", errors="ignore")
-        raise RuntimeError(f"LLM call failed: {exc.code} {exc.reason}: {detail}") from exc
-    except urllib.error.URLError as exc:
+        resp = _http.post(target, data, headers=headers, timeout=timeout)
+    except (OSError, http.client.HTTPException) as exc:
         raise RuntimeError(f"LLM call failed: {exc}") from exc
+    if resp.status >= 400:
+        detail = resp.body.decode("utf-8", errors="ignore")
+        raise RuntimeError(f"LLM call failed: {resp.status} {resp.reason}: {detail}")
 
-    result = json.loads(body)
+    result = _jsonio.loads(resp.body)
     if not isinstance(result, dict) or "choices" not in result:
         raise RuntimeError(f"Unexpected LLM response: {result}")
 
@@ -1,18 +1,50 @@
 from __future__ import annotations
 
-import json
+import atexit
+import os
+import queue
+import threading
+import time
 import urllib.error
 import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-from .storage import DATA_DIR, ensure_dirs
-from .config import get_mem0_settings
+from . import _jsonio
+from .storage import DATA_DIR, ensure_dirs, write_bytes_atomic
+from .config import MEM0Settings, get_mem0_settings, get_openai_settings
 
 
 MEMORY_DIR = DATA_DIR / "memory"
 USER_AGENT = "paper-sailor/0.3"
+SEARCH_CACHE_TTL = 30.0  # seconds
+SEARCH_CACHE_SIZE = 256  # cached (level, query, limit) results per manager
+AGENT_KNOWLEDGE_LIMIT = 200
+MEM0_BATCH_SIZE = 64
+MEM0_BATCH_DELAY = 0.2  # seconds
+MEM0_SEND_CONCURRENCY = 4  # user_id groups of one batch sent in parallel
+
+# Held across each read-modify-write of a memory file, so concurrent adds are not lost
+_WRITE_LOCK = threading.Lock()
+# Bumped after every local memory write; part of the search cache key, so a write through
+# one MemoryManager is visible to searches through any other right away.
+_local_generation = 0
+
+# MEM0 client shared by every MemoryManager; built on first use.
+_MEM0_CLIENT: Any = None
+_MEM0_TRIED = False
+_MEM0_LOCK = threading.Lock()
+# Pending MEM0 adds: (user_id, message, local fallback); drained by a daemon worker.
+_MEM0_QUEUE: "queue.Queue[Tuple[str, Dict[str, str], Callable[[], None]]]" = queue.Queue()
+_mem0_worker: Optional[threading.Thread] = None
+# Bumped after every successful MEM0 add; part of the search cache key, so results cached
+# by any MemoryManager before the add landed are not served afterwards.
+_mem0_generation = 0
 
 
 def _ensure_memory_dir() -> None:
@@ -24,53 +56,82 @@ def _read_json(path: Path) -> Dict[str, Any]:
     if not path.exists():
         return {}
     try:
-        with path.open("r", encoding="utf-8") as f:
-            return json.load(f)
+        with path.open("rb") as f:
+            return _jsonio.loads(f.read())
+    except Exception:
+        return {}
+
+
+@lru_cache(maxsize=512)
+def _load_json_file(path_str: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    with open(path_str, "rb") as f:
+        return _jsonio.loads(f.read())
+
+
+def _read_json_cached(path: Path) -> Dict[str, Any]:
+    """Like _read_json, but reuses the parsed dict while the file's mtime/size are unchanged.
+
+    The returned dict is shared; callers must treat it as read-only.
+    """
+    try:
+        st = path.stat()
+        return _load_json_file(str(path), st.st_mtime_ns, st.st_size)
     except Exception:
         return {}
 
 
 def _write_json(path: Path, data: Dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    write_bytes_atomic(path, _jsonio.dumps(data, indent=True))
 
 
-@dataclass(frozen=True)
-class MemoryEndpoints:
-    create: str
-    search: str
+def _trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
 
 
-class MemoryManager:
-    """Multi-level memory manager with MEM0 integration.
+class _TrigramIndex:
+    """Trigram postings over memory texts; narrows substring search to a few candidates."""
 
-    Uses MEM0 Python SDK if available and configured, otherwise falls back
-    to local JSON storage.
-    """
+    def __init__(self, texts: List[str]) -> None:
+        self.texts = texts
+        self.folded = [t.casefold() for t in texts]
+        self.grams: Dict[str, Set[int]] = {}
+        for idx, folded in enumerate(self.folded):
+            for gram in _trigrams(folded):
+                self.grams.setdefault(gram, set()).add(idx)
 
-    def __init__(self) -> None:
-        self.settings = get_mem0_settings()
-        _ensure_memory_dir()
-        
-        # Try to use MEM0 SDK
-        self.use_mem0 = False
-        self.mem0_client = None
-        
-        if self.settings.api_key:
+    def search(self, q_folded: str) -> Iterator[str]:
+        grams = _trigrams(q_folded)
+        if grams:
+            # Any text containing q_folded contains all of its trigrams; start from the rarest
+            buckets = sorted((self.grams.get(g, set()) for g in grams), key=len)
+            candidates = sorted(buckets[0].intersection(*buckets[1:]))
+        else:
+            candidates = range(len(self.texts))  # queries under 3 chars: plain scan
+        for idx in candidates:
+            if q_folded in self.folded[idx]:
+                yield self.texts[idx]
+
+
+def _get_mem0_client(settings: MEM0Settings) -> Any:
+    """Create the MEM0 client once per process; later calls return the cached result (or None)."""
+    global _MEM0_CLIENT, _MEM0_TRIED
+    with _MEM0_LOCK:
+        if _MEM0_TRIED:
+            return _MEM0_CLIENT
+        _MEM0_TRIED = True
+        client = None
+        if settings.api_key:
             try:
                 # Try MemoryClient first (for MEM0 Cloud)
                 try:
                     from mem0 import MemoryClient
-                    self.mem0_client = MemoryClient(api_key=self.settings.api_key)
-                    self.use_mem0 = True
+                    client = MemoryClient(api_key=settings.api_key)
                     print(f"✅ MEM0 Cloud SDK initialized")
                 except ImportError:
                     # Fallback to Memory class (for MEM0 OSS)
                     from mem0 import Memory
-                    from .config import get_openai_settings
                     openai_settings = get_openai_settings()
-                    
+
                     config = {
                         "version": "v1.1",
                         "vector_store": {
@@ -99,13 +160,105 @@ class MemoryManager:
                             }
                         }
                     }
-                    self.mem0_client = Memory.from_config(config)
-                    self.use_mem0 = True
+                    client = Memory.from_config(config)
                     print(f"✅ MEM0 OSS SDK initialized")
             except ImportError:
                 print("⚠️  mem0ai not installed, using local storage")
             except Exception as exc:
                 print(f"⚠️  MEM0 initialization failed: {exc}, using local storage")
+        _MEM0_CLIENT = client
+        return client
+
+
+def _enqueue_mem0(user_id: str, message: Dict[str, str], fallback: Callable[[], None]) -> None:
+    global _mem0_worker
+    with _MEM0_LOCK:
+        if _mem0_worker is None:
+            _mem0_worker = threading.Thread(target=_drain_mem0, name="mem0-writer", daemon=True)
+            _mem0_worker.start()
+    _MEM0_QUEUE.put((user_id, message, fallback))
+
+
+def _drain_mem0() -> None:
+    while True:
+        batch = [_MEM0_QUEUE.get()]
+        deadline = time.monotonic() + MEM0_BATCH_DELAY
+        while len(batch) < MEM0_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_MEM0_QUEUE.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            _send_mem0_batch(batch)
+        finally:
+            for _ in batch:
+                _MEM0_QUEUE.task_done()
+
+
+def _send_mem0_batch(batch: List[Tuple[str, Dict[str, str], Callable[[], None]]]) -> None:
+    """One add() per user_id, sent concurrently; on failure each entry falls back to local storage."""
+    grouped: Dict[str, List[Tuple[Dict[str, str], Callable[[], None]]]] = {}
+    for user_id, message, fallback in batch:
+        grouped.setdefault(user_id, []).append((message, fallback))
+    if len(grouped) == 1:
+        _send_mem0_group(*next(iter(grouped.items())))
+        return
+    with ThreadPoolExecutor(max_workers=min(len(grouped), MEM0_SEND_CONCURRENCY)) as pool:
+        list(pool.map(lambda group: _send_mem0_group(*group), grouped.items()))
+
+
+def _send_mem0_group(user_id: str, items: List[Tuple[Dict[str, str], Callable[[], None]]]) -> None:
+    global _mem0_generation
+    try:
+        _MEM0_CLIENT.add(messages=[message for message, _ in items], user_id=user_id)
+        with _MEM0_LOCK:
+            _mem0_generation += 1
+        print(f"✅ MEM0: Added {len(items)} memories for {user_id}")
+    except Exception as exc:
+        print(f"⚠️  MEM0 add failed: {exc}, using local fallback")
+        for _, fallback in items:
+            fallback()
+
+
+def flush_mem0() -> None:
+    """Block until every queued MEM0 add has been sent (or fallen back to local storage)."""
+    if _mem0_worker is not None:
+        _MEM0_QUEUE.join()
+
+
+atexit.register(flush_mem0)
+
+
+@dataclass(frozen=True)
+class MemoryEndpoints:
+    create: str
+    search: str
+
+
+class MemoryManager:
+    """Multi-level memory manager with MEM0 integration.
+
+    Uses MEM0 Python SDK if available and configured, otherwise falls back
+    to local JSON storage.
+    """
+
+    def __init__(self) -> None:
+        self.settings = get_mem0_settings()
+        _ensure_memory_dir()
+        # (level, casefolded query, limit, MEM0 generation) -> (expires_at, results), least
+        # recently used first; cleared on every local write
+        self._search_cache: "OrderedDict[Tuple[str, str, int, int, int], Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._search_lock = threading.Lock()
+        # level -> (file signature, index); rebuilt when any backing file changes
+        self._indexes: Dict[str, Tuple[Tuple, _TrigramIndex]] = {}
+        self._dir_cache: Optional[Tuple[int, Dict[str, List[Path]]]] = None
+        
+        # Try to use MEM0 SDK
+        self.mem0_client = _get_mem0_client(self.settings)
+        self.use_mem0 = self.mem0_client is not None
 
     # ---------- Local fallback helpers ----------
     def _user_path(self, user_id: str) -> Path:
@@ -117,90 +270,192 @@ class MemoryManager:
     def _agent_path(self) -> Path:
         return MEMORY_DIR / "agent.json"
 
+    def _level_files(self, level: str) -> List[Path]:
+        if level not in ("user", "session"):
+            return [self._agent_path()]
+        return list(self._scan_dir().get(level, []))
+
+    def _scan_dir(self) -> Dict[str, List[Path]]:
+        """List memory files bucketed by level; rescanned only when the directory mtime changes."""
+        try:
+            mtime = os.stat(MEMORY_DIR).st_mtime_ns
+        except OSError:
+            return {}
+        if self._dir_cache is not None and self._dir_cache[0] == mtime:
+            return self._dir_cache[1]
+        buckets: Dict[str, List[Path]] = {"user": [], "session": []}
+        with os.scandir(MEMORY_DIR) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.endswith(".json"):
+                    continue
+                if name.startswith("user_"):
+                    buckets["user"].append(MEMORY_DIR / name)
+                elif name.startswith("session_"):
+                    buckets["session"].append(MEMORY_DIR / name)
+        self._dir_cache = (mtime, buckets)
+        return buckets
+
+    def _level_index(self, level: str) -> _TrigramIndex:
+        paths = self._level_files(level)
+        signature: List[Tuple] = []
+        for path in paths:
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            signature.append((str(path), st.st_mtime_ns, st.st_size))
+        cached = self._indexes.get(level)
+        if cached is not None and cached[0] == tuple(signature):
+            return cached[1]
+
+        texts: List[str] = []
+        for path in paths:
+            data = _read_json_cached(path)
+            if level == "user":
+                texts.extend(str(pref) for pref in data.get("preferences", []))
+            elif level == "session":
+                ctx = data.get("context", {})
+                if isinstance(ctx, dict):
+                    texts.extend(f"{k}: {v}" for k, v in ctx.items())
+            else:
+                texts.extend(str(item) for item in data.get("knowledge", []))
+        index = _TrigramIndex(texts)
+        self._indexes[level] = (tuple(signature), index)
+        return index
+
+    def flush(self) -> None:
+        """Send queued MEM0 adds (also runs automatically at exit)."""
+        flush_mem0()
+
+    def _invalidate(self) -> None:
+        with self._search_lock:
+            self._search_cache.clear()
+        self._indexes.clear()
+
     # ---------- Public API ----------
     def add_user_preference(self, user_id: str, preference: str) -> None:
         """Store user-level memory (preferences & interests)."""
         if not user_id or not preference:
             return
-        
-        # Try MEM0 first
+        self._invalidate()
+        fallback = partial(self._store_user_preference, user_id, preference)
+
+        # Try MEM0 first (queued; falls back to local storage if the add fails)
         if self.use_mem0 and self.mem0_client:
-            try:
-                self.mem0_client.add(
-                    messages=[{"role": "user", "content": preference}],
-                    user_id=user_id
-                )
-                print(f"✅ MEM0: Added user preference for {user_id}")
-                return
-            except Exception as exc:
-                print(f"⚠️  MEM0 add failed: {exc}, using local fallback")
-        
-        # Local fallback
-        data = _read_json(self._user_path(user_id))
-        prefs: List[str] = list(map(str, data.get("preferences", [])))
-        if preference and preference not in prefs:
-            prefs.append(preference)
-        data["preferences"] = prefs
-        _write_json(self._user_path(user_id), data)
+            _enqueue_mem0(user_id, {"role": "user", "content": preference}, fallback)
+            return
+        fallback()
+
+    def _store_user_preference(self, user_id: str, preference: str) -> None:
+        global _local_generation
+        with _WRITE_LOCK:
+            data = _read_json(self._user_path(user_id))
+            prefs: List[str] = list(map(str, data.get("preferences", [])))
+            if preference and preference not in prefs:
+                prefs.append(preference)
+            data["preferences"] = prefs
+            _write_json(self._user_path(user_id), data)
+            _local_generation += 1
+        self._invalidate()
 
     def add_session_context(self, session_id: str, context: Dict[str, Any]) -> None:
         """Store session-level memory (topic, selected papers, notes)."""
         if not session_id or not context:
             return
-        
-        # Try MEM0 first
+        self._invalidate()
+        fallback = partial(self._store_session_context, session_id, context)
+
+        # Try MEM0 first (queued; falls back to local storage if the add fails)
         if self.use_mem0 and self.mem0_client:
-            try:
-                # Convert context dict to string for MEM0
-                context_str = json.dumps(context, ensure_ascii=False)
-                self.mem0_client.add(
-                    messages=[{"role": "assistant", "content": f"Session context: {context_str}"}],
-                    user_id=f"session_{session_id}"
-                )
-                print(f"✅ MEM0: Added session context for {session_id}")
-                return
-            except Exception as exc:
-                print(f"⚠️  MEM0 add failed: {exc}, using local fallback")
-        
-        # Local fallback
-        data = _read_json(self._session_path(session_id))
-        ctx = data.get("context", {})
-        if not isinstance(ctx, dict):
-            ctx = {}
-        ctx.update({k: v for k, v in (context or {}).items()})
-        data["context"] = ctx
-        _write_json(self._session_path(session_id), data)
+            # Convert context dict to string for MEM0
+            context_str = _jsonio.dumps(context).decode("utf-8")
+            message = {"role": "assistant", "content": f"Session context: {context_str}"}
+            _enqueue_mem0(f"session_{session_id}", message, fallback)
+            return
+        fallback()
+
+    def _store_session_context(self, session_id: str, context: Dict[str, Any]) -> None:
+        global _local_generation
+        with _WRITE_LOCK:
+            data = _read_json(self._session_path(session_id))
+            ctx = data.get("context", {})
+            if not isinstance(ctx, dict):
+                ctx = {}
+            ctx.update({k: v for k, v in (context or {}).items()})
+            data["context"] = ctx
+            _write_json(self._session_path(session_id), data)
+            _local_generation += 1
+        self._invalidate()
 
     def add_agent_knowledge(self, knowledge: str) -> None:
         """Store agent-level knowledge (methods, heuristics)."""
         if not knowledge:
             return
-        
-        # Try MEM0 first
+        self._invalidate()
+        fallback = partial(self._store_agent_knowledge, knowledge)
+
+        # Try MEM0 first (queued; falls back to local storage if the add fails)
         if self.use_mem0 and self.mem0_client:
-            try:
-                self.mem0_client.add(
-                    messages=[{"role": "system", "content": knowledge}],
-                    user_id="agent_global"
-                )
-                print(f"✅ MEM0: Added agent knowledge")
-                return
-            except Exception as exc:
-                print(f"⚠️  MEM0 add failed: {exc}, using local fallback")
-        
-        # Local fallback
-        data = _read_json(self._agent_path())
-        items: List[str] = list(map(str, data.get("knowledge", [])))
-        items.append(knowledge)
-        data["knowledge"] = items[-200:]  # cap growth
-        _write_json(self._agent_path(), data)
+            _enqueue_mem0("agent_global", {"role": "system", "content": knowledge}, fallback)
+            return
+        fallback()
+
+    def add_many(self, entries: Iterable[Dict[str, Any]]) -> None:
+        """Store several memories at once; their MEM0 adds go out in one batch.
+
+        Each entry has a ``level``: ``"user"`` (``user_id``, ``preference``), ``"session"``
+        (``session_id``, ``context``) or ``"agent"`` (``knowledge``).
+        """
+        for entry in entries:
+            level = entry.get("level")
+            if level == "user":
+                self.add_user_preference(entry.get("user_id", ""), entry.get("preference", ""))
+            elif level == "session":
+                self.add_session_context(entry.get("session_id", ""), entry.get("context") or {})
+            elif level == "agent":
+                self.add_agent_knowledge(entry.get("knowledge", ""))
+            else:
+                raise ValueError(f"Unknown memory level: {level}")
+
+    def _store_agent_knowledge(self, knowledge: str) -> None:
+        global _local_generation
+        with _WRITE_LOCK:
+            data = _read_json(self._agent_path())
+            items = data.get("knowledge")
+            if not isinstance(items, list):
+                items = []
+            # Keep only the newest AGENT_KNOWLEDGE_LIMIT entries
+            items.append(knowledge)
+            if len(items) > AGENT_KNOWLEDGE_LIMIT:
+                del items[:-AGENT_KNOWLEDGE_LIMIT]
+            data["knowledge"] = items
+            _write_json(self._agent_path(), data)
+            _local_generation += 1
+        self._invalidate()
 
     def search_memory(self, query: str, level: str, limit: int = 5) -> List[Dict[str, Any]]:
-        """Search memory across one level."""
+        """Search memory across one level; queued MEM0 adds are sent first, so writes are visible."""
         q = (query or "").strip()
         if not q:
             return []
-        
+        if self.use_mem0 and self.mem0_client:
+            flush_mem0()
+        key = (level, q.casefold(), limit, _mem0_generation, _local_generation)
+        with self._search_lock:
+            cached = self._search_cache.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                self._search_cache.move_to_end(key)
+                return list(cached[1])
+        results = self._search_memory(q, level, limit)
+        with self._search_lock:
+            self._search_cache[key] = (time.monotonic() + SEARCH_CACHE_TTL, results)
+            self._search_cache.move_to_end(key)
+            while len(self._search_cache) > SEARCH_CACHE_SIZE:
+                self._search_cache.popitem(last=False)
+        return list(results)
+
+    def _search_memory(self, q: str, level: str, limit: int) -> List[Dict[str, Any]]:
         # Try MEM0 first
         if self.use_mem0 and self.mem0_client:
             try:
@@ -232,32 +487,9 @@ class MemoryManager:
                 pass
         
         # Local fallback
-        results: List[Dict[str, Any]] = []
-        q_lower = q.lower()
-        
-        if level == "user":
-            for path in MEMORY_DIR.glob("user_*.json"):
-                data = _read_json(path)
-                for pref in data.get("preferences", []):
-                    text = str(pref)
-                    if q_lower in text.lower():
-                        results.append({"level": "user", "text": text})
-        elif level == "session":
-            for path in MEMORY_DIR.glob("session_*.json"):
-                data = _read_json(path)
-                ctx = data.get("context", {})
-                for k, v in ctx.items():
-                    text = f"{k}: {v}"
-                    if q_lower in text.lower():
-                        results.append({"level": "session", "text": text})
-        else:  # agent
-            data = _read_json(self._agent_path())
-            for item in data.get("knowledge", []):
-                text = str(item)
-                if q_lower in text.lower():
-                    results.append({"level": "agent", "text": text})
-        
-        return results[:limit]
+        level_name = level if level in ("user", "session") else "agent"
+        matches = self._level_index(level_name).search(q.casefold())
+        return [{"level": level_name, "text": text} for text in islice(matches, limit)]
 
     def get_relevant_context(self, session_id: str, question: str) -> str:
         """Return a short context string from session memory for prompting."""
@@ -277,7 +509,7 @@ class MemoryManager:
                 pass
         
         # Local fallback
-        data = _read_json(self._session_path(session_id))
+        data = _read_json_cached(self._session_path(session_id))
         ctx = data.get("context", {})
         if not isinstance(ctx, dict) or not ctx:
             return ""
@@ -2,50 +2,22 @@ from __future__ import annotations
 
 import json
 import uuid
+from itertools import islice
 from typing import Any, Dict, List, Tuple
 
+from . import _jsonio
 from .llm import call_llm
-
-
-SYSTEM_PROMPT = """
-You are the Planner for the Paper Sailor research agent. Your job is to guide a
-multi-step exploration of scientific papers for the given topic. At each turn
-you will see the current memory and a summary of the previous executor result.
-
-Always respond with a single JSON object. The JSON must contain:
-
-{
-  "action": string,            # one of: search, read, summarize, finish
-  "queries": [ ... ],          # required when action == "search"
-  "papers": [ ... ],           # required when action == "read"
-  "focus": [ ... ],            # required when action == "summarize"
-  "notes": string,             # brief intent rationale
-  "todo": [
-      {"title": string, "status": "todo" | "doing" | "done"}
-  ]
-}
-
-Rules:
-- Generate 1-3 search queries when searching. Prefer arXiv field syntax
-  (e.g., "all:graph AND all:molecules"), otherwise plain keywords.
-- When reading, choose from known paper ids.
-- When summarizing, list focus questions or themes you want the executor to
-  synthesize using available notes/chunks.
-- Use the todo list to track medium-term subgoals. Update statuses explicitly.
-- Finish only when you believe major questions are answered or the budget is
-  exhausted. Provide a short summary in notes when finishing.
-"""
+from .prompts import PLANNER_SYSTEM_PROMPT as SYSTEM_PROMPT
 
 
 def _extract_text(response: Dict[str, Any]) -> str:
-    pieces: List[str] = []
-    for item in response.get("output", []):
-        if item.get("type") != "message":
-            continue
-        for content in item.get("content", []):
-            if content.get("type") == "output_text":
-                pieces.append(content.get("text", ""))
-    text = "".join(pieces).strip()
+    text = "".join(
+        content.get("text", "")
+        for item in response.get("output", [])
+        if item.get("type") == "message"
+        for content in item.get("content", [])
+        if content.get("type") == "output_text"
+    ).strip()
     if text:
         return text
     choices = response.get("choices", [])
@@ -70,14 +42,19 @@ def _ensure_tasks(tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
 
 
 def _merge_tasks(existing: List[Dict[str, Any]], updates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    by_title = {t["title"].lower(): t for t in existing}
+    """Apply ``updates`` to ``existing`` in place (matched by case-insensitive title) and return it."""
+    if not updates:
+        return existing
+    index = {t["title"].lower(): i for i, t in enumerate(existing)}
     for upd in updates:
         key = upd["title"].lower()
-        if key in by_title:
-            by_title[key]["status"] = upd["status"]
+        pos = index.get(key)
+        if pos is not None:
+            existing[pos]["status"] = upd["status"]
         else:
-            by_title[key] = upd
-    return list(by_title.values())
+            index[key] = len(existing)
+            existing.append(upd)
+    return existing
 
 
 def _render_state(state: Dict[str, Any], observation: str) -> str:
@@ -99,7 +76,7 @@ def _render_state(state: Dict[str, Any], observation: str) -> str:
                 "id": pid,
                 "status": meta.get("status", "discovered"),
             }
-            for pid, meta in list(papers.items())[:10]
+            for pid, meta in islice(papers.items(), 10)
         ],
         "queries_tried": queries[-5:],
         "findings": [
@@ -122,7 +99,7 @@ def _render_state(state: Dict[str, Any], observation: str) -> str:
         ],
         "last_observation": observation[:400],
     }
-    return json.dumps(snapshot, ensure_ascii=False, indent=2)
+    return _jsonio.dumps(snapshot, indent=True).decode("utf-8")
 
 
 class Planner:
@@ -145,7 +122,7 @@ class Planner:
         if not text:
             raise RuntimeError(f"Planner returned empty response: {json.dumps(response, ensure_ascii=False)[:2000]}")
         try:
-            payload = json.loads(text)
+            payload = _jsonio.loads(text)
         except json.JSONDecodeError as exc:
             raise RuntimeError(f"Planner output is not valid JSON: {text}") from exc
 
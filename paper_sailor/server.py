@@ -1,22 +1,52 @@
 from __future__ import annotations
 
 import http.server
-import json
 import os
 import posixpath
 import re
-import socketserver
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Tuple
+from typing import Callable, Tuple
 
-from .storage import DATA_DIR, NOTES_DIR, list_sessions, session_path, json_read, papers_jsonl, jsonl_read
+from . import _jsonio
+from .storage import DATA_DIR, NOTES_DIR, ensure_dirs, list_sessions, session_path, papers_jsonl, jsonl_read
 
 
 ROOT = Path(__file__).resolve().parent.parent
 UI_DIR = ROOT / "ui"
 
+_SESSION_PREFIX = "/api/sessions/"
+_VALID_SID = re.compile(r"[\w\-\.]+")
+
+
+RESPONSE_CACHE_SIZE = 256
+_RESP_CACHE: "OrderedDict[str, Tuple[int, int, bytes]]" = OrderedDict()
+_RESP_LOCK = threading.Lock()
+
+
+def _cached_body(path: Path, build: Callable[[], object]) -> bytes:
+    """Return the encoded response for ``path``, rebuilding only when its mtime/size changed."""
+    st = path.stat()
+    key = str(path)
+    with _RESP_LOCK:
+        hit = _RESP_CACHE.get(key)
+        if hit is not None and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+            _RESP_CACHE.move_to_end(key)
+            return hit[2]
+    data = _jsonio.dumps(build())
+    with _RESP_LOCK:
+        _RESP_CACHE[key] = (st.st_mtime_ns, st.st_size, data)
+        _RESP_CACHE.move_to_end(key)
+        while len(_RESP_CACHE) > RESPONSE_CACHE_SIZE:
+            _RESP_CACHE.popitem(last=False)
+    return data
+
 
 class Handler(http.server.SimpleHTTPRequestHandler):
+    # Keep-alive: every response below carries a Content-Length.
+    protocol_version = "HTTP/1.1"
+
     def translate_path(self, path: str) -> str:
         # Serve UI static files by default
         path = posixpath.normpath(path)
@@ -31,6 +61,7 @@ class Handler(http.server.SimpleHTTPRequestHandler):
     def do_OPTIONS(self):
         self.send_response(200)
         self._cors()
+        self.send_header("Content-Length", "0")
         self.end_headers()
 
     def do_GET(self):
@@ -49,29 +80,40 @@ class Handler(http.server.SimpleHTTPRequestHandler):
         self.send_header("Access-Control-Allow-Methods", "GET, OPTIONS")
 
     def _json(self, obj, code: int = 200):
-        data = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self._send(_jsonio.dumps(obj), code)
+
+    def _send(self, data: bytes, code: int = 200):
+        self._send_headers(code, len(data))
+        self.wfile.write(data)
+
+    def _send_headers(self, code: int, length: int):
         self.send_response(code)
         self._cors()
         self.send_header("Content-Type", "application/json; charset=utf-8")
-        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Content-Length", str(length))
         self.end_headers()
-        self.wfile.write(data)
+
+    def _send_json_file(self, path: Path):
+        """Send an on-disk JSON document as-is instead of decoding and re-encoding it."""
+        self._send(path.read_bytes())
 
     def _handle_api(self):
         if self.path == "/api/sessions":
-            return self._json({"sessions": list_sessions()})
+            ensure_dirs()
+            return self._send(_cached_body(NOTES_DIR, lambda: {"sessions": list_sessions()}))
 
-        m = re.match(r"^/api/sessions/([\w\-\.]+)$", self.path)
-        if m:
-            sid = m.group(1)
+        if self.path.startswith(_SESSION_PREFIX) and _VALID_SID.fullmatch(self.path, len(_SESSION_PREFIX)):
+            sid = self.path[len(_SESSION_PREFIX):]
             path = session_path(sid)
             if not path.exists():
                 return self._json({"error": "not found"}, 404)
-            return self._json(json_read(path))
+            return self._send_json_file(path)
 
         if self.path == "/api/papers":
-            papers = list(jsonl_read(papers_jsonl())) if papers_jsonl().exists() else []
-            return self._json({"papers": papers})
+            path = papers_jsonl()
+            if not path.exists():
+                return self._json({"papers": []})
+            return self._send(_cached_body(path, lambda: {"papers": list(jsonl_read(path))}))
 
         return self._json({"error": "unknown endpoint"}, 404)
 
@@ -85,7 +127,7 @@ def main(argv=None):
     args = parser.parse_args(argv)
 
     handler = Handler
-    with socketserver.TCPServer((args.host, args.port), handler) as httpd:
+    with http.server.ThreadingHTTPServer((args.host, args.port), handler) as httpd:
         print(f"Paper Sailor UI at http://{args.host}:{args.port}")
         try:
             httpd.serve_forever()
@@ -1,6 +1,19 @@
+import copy
+import gzip
+import io
 import json
+import mmap
+import os
+import threading
 from pathlib import Path
-from typing import Any, Dict, Iterable, Iterator, List, Optional
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import _jsonio
+
+try:  # Optional dependency
+    import zstandard  # type: ignore
+except Exception:  # pragma: no cover - optional import
+    zstandard = None  # type: ignore
 
 
 ROOT = Path(__file__).resolve().parent.parent
@@ -10,6 +23,11 @@ CHUNK_DIR = DATA_DIR / "chunks"
 NOTES_DIR = DATA_DIR / "notes"
 STATE_DIR = DATA_DIR / "sessions"
 VECTOR_DB = DATA_DIR / "vectors.sqlite3"
+WRITE_BUFFER_SIZE = 1024 * 1024
+GZIP_LEVEL = 3  # chunk text compresses ~4x even at fast levels
+
+# (notes dir mtime_ns, session ids) from the last list_sessions scan
+_SESSIONS_CACHE: Optional[Tuple[int, List[str]]] = None
 
 
 def ensure_dirs() -> None:
@@ -17,45 +35,104 @@ def ensure_dirs() -> None:
         p.mkdir(parents=True, exist_ok=True)
 
 
+def _open_binary(path: Path, mode: str, buffering: int = -1) -> IO[bytes]:
+    """Open ``path`` in binary ``mode``, transparently (de)compressing ``.gz`` / ``.zst`` files."""
+    if path.suffix == ".gz":
+        raw = gzip.open(path, mode, compresslevel=GZIP_LEVEL)
+    elif path.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError("zstandard not installed; cannot open .zst files")
+        raw = zstandard.open(path, mode)
+    else:
+        return path.open(mode, buffering=buffering)
+    if "r" in mode:
+        return io.BufferedReader(raw)
+    return io.BufferedWriter(raw, buffer_size=WRITE_BUFFER_SIZE)
+
+
 def jsonl_append(path: Path, obj: Dict[str, Any]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+    with _open_binary(path, "ab") as f:
+        f.write(_jsonio.dumps(obj) + b"\n")
+
+
+def jsonl_append_many(path: Path, objs: Iterable[Dict[str, Any]]) -> None:
+    payload = b"".join(_jsonio.dumps(obj) + b"\n" for obj in objs)
+    if not payload:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _open_binary(path, "ab") as f:
+        f.write(payload)
 
 
 def jsonl_write(path: Path, objs: Iterable[Dict[str, Any]]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        for obj in objs:
-            f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+    # Large buffer: a paper's chunks go out in a handful of write syscalls
+    with _open_binary(path, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+        f.writelines(_jsonio.dumps(obj) + b"\n" for obj in objs)
 
 
-def json_write(path: Path, obj: Dict[str, Any]) -> None:
+def write_bytes_atomic(path: Path, payload: bytes, *, durable: bool = False) -> None:
+    """Replace ``path`` with ``payload`` via a temp file, so readers never see a partial file."""
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with tmp.open("wb") as f:
+            f.write(payload)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def json_write(path: Path, obj: Dict[str, Any], *, durable: bool = False, indent: bool = True) -> None:
+    write_bytes_atomic(path, _jsonio.dumps(obj, indent=indent), durable=durable)
 
 
 def json_read(path: Path) -> Dict[str, Any]:
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    with path.open("rb") as f:
+        return _jsonio.loads(f.read())
 
 
 def jsonl_read(path: Path) -> Iterator[Dict[str, Any]]:
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                yield json.loads(line)
-            except json.JSONDecodeError:
-                continue
+    if path.suffix in (".gz", ".zst"):
+        with _open_binary(path, "rb") as f:
+            yield from _decode_lines(f)
+        return
+    with path.open("rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            return  # mmap cannot map empty files
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield from _decode_lines(iter(mm.readline, b""))
+
+
+def _decode_lines(lines: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield _jsonio.loads(line)
+        except json.JSONDecodeError:  # orjson.JSONDecodeError subclasses it
+            continue
 
 
 def list_sessions() -> List[str]:
-    ensure_dirs()
-    return [p.stem for p in NOTES_DIR.glob("*.json")]
+    """Session ids with notes; the directory is rescanned only when its mtime changes."""
+    global _SESSIONS_CACHE
+    try:
+        mtime = NOTES_DIR.stat().st_mtime_ns
+    except FileNotFoundError:
+        ensure_dirs()
+        mtime = NOTES_DIR.stat().st_mtime_ns
+    if _SESSIONS_CACHE is None or _SESSIONS_CACHE[0] != mtime:
+        with os.scandir(NOTES_DIR) as entries:
+            names = [e.name[:-5] for e in entries if e.name.endswith(".json") and not e.name.startswith(".")]
+        _SESSIONS_CACHE = (mtime, names)
+    return list(_SESSIONS_CACHE[1])
 
 
 def session_path(session_id: str) -> Path:
@@ -68,12 +145,33 @@ def session_state_path(session_id: str) -> Path:
 
 def load_json_default(path: Path, default: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     if not path.exists():
-        return default.copy() if default else {}
+        # Deep copy: callers mutate nested lists/dicts of the returned state in place
+        return copy.deepcopy(default) if default else {}
     return json_read(path)
 
 
+def session_history_path(session_id: str) -> Path:
+    return STATE_DIR / f"{session_id}.history.jsonl"
+
+
 def save_session_state(session_id: str, state: Dict[str, Any]) -> None:
-    json_write(session_state_path(session_id), state)
+    """Checkpoint ``state`` without its history, which lives in the append-only side log.
+
+    Checkpoints are machine-read only, so they are written compact.
+    """
+    core = {k: v for k, v in state.items() if k != "history"}
+    json_write(session_state_path(session_id), core, durable=True, indent=False)
+
+
+def append_session_history(session_id: str, entry: Dict[str, Any]) -> None:
+    jsonl_append(session_history_path(session_id), entry)
+
+
+def load_session_history(session_id: str) -> List[Dict[str, Any]]:
+    path = session_history_path(session_id)
+    if not path.exists():
+        return []
+    return list(jsonl_read(path))
 
 
 def papers_jsonl() -> Path:
@@ -85,7 +183,7 @@ def pdf_path(paper_id: str) -> Path:
 
 
 def chunks_path(paper_id: str) -> Path:
-    return CHUNK_DIR / f"{paper_id}.jsonl"
+    return CHUNK_DIR / f"{paper_id}.jsonl.gz"
 
 
 def vector_store_path() -> Path:
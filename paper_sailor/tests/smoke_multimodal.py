@@ -2,8 +2,14 @@ from __future__ import annotations
 
 import math
 import random
-from typing import Dict, List
-
+import re
+import tempfile
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import paper_sailor.vectorstore as vsmod
 from paper_sailor.vectorstore import VectorStore
 from paper_sailor.tools.retrieval import multimodal_retrieve
 from paper_sailor.memory import MemoryManager
@@ -11,6 +17,7 @@ import paper_sailor.tools.embeddings as embmod
 import paper_sailor.tools.retrieval as retmod
 
 
+@lru_cache(maxsize=4096)
 def _hash_token(tok: str, dim: int) -> int:
     # Simple, deterministic hash function
     h = 0
@@ -19,17 +26,18 @@ def _hash_token(tok: str, dim: int) -> int:
     return h % dim
 
 
+_TOKEN_RE = re.compile(r"[^\W_]+")  # runs of alphanumerics
+
+
 def _tokenize(text: str) -> List[str]:
-    return [t for t in "".join(ch.lower() if ch.isalnum() else " " for ch in text).split() if t]
+    return _TOKEN_RE.findall(text.lower())
 
 
 def _hash_embedding(text: str, dim: int = 64) -> List[float]:
-    vec = [0.0] * dim
-    for tok in _tokenize(text):
-        idx = _hash_token(tok, dim)
-        vec[idx] += 1.0
+    counts = Counter(_hash_token(tok, dim) for tok in _tokenize(text))
+    vec = [float(counts.get(i, 0)) for i in range(dim)]
     # L2 normalize
-    norm = math.sqrt(sum(x * x for x in vec))
+    norm = math.hypot(*vec)
     if norm > 0:
         vec = [x / norm for x in vec]
     return vec
@@ -52,6 +60,87 @@ def _mk_record(chunk_id: str, paper_id: str, text: str, ctype: str = "text") ->
     }
 
 
+def _random_records(rng: random.Random, start: int, count: int, dim: int = 64) -> List[Dict]:
+    records = []
+    for i in range(start, start + count):
+        vec = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+        records.append({"chunk_id": f"r:{i:04d}", "paper_id": "r", "text": f"chunk {i}", "embedding": vec})
+    return records
+
+
+def _pure_python_scores(store: VectorStore, session_id: str, query: List[float]) -> Dict[str, float]:
+    """Every chunk's cosine from the list-based path, as used when numpy is missing."""
+    saved = vsmod.np
+    vsmod.np = None
+    try:
+        store._vectors.clear()
+        return dict(store.score(session_id, query, top_k=10**6))
+    finally:
+        vsmod.np = saved
+        store._vectors.clear()
+
+
+def _assert_matches(ranked: List[Tuple[str, float]], reference: Dict[str, float], top_k: int, tol: float, label: str) -> None:
+    """Same top-k as the reference up to near-ties, with scores within ``tol``."""
+    expected = sorted(reference.values(), reverse=True)[:top_k]
+    assert len(ranked) == len(expected), f"{label}: expected {len(expected)} hits, got {len(ranked)}"
+    for rank, (chunk_id, score) in enumerate(ranked):
+        assert abs(score - reference[chunk_id]) <= tol, f"{label}: score of {chunk_id} off by {score - reference[chunk_id]:.4f}"
+        assert abs(reference[chunk_id] - expected[rank]) <= 2 * tol, f"{label}: rank {rank} holds {chunk_id} out of order"
+
+
+def check_numpy_paths() -> None:
+    """The numpy scoring paths (int8, float16, HNSW) must agree with the pure-Python one."""
+    if vsmod.np is None:
+        print("SKIP: numpy not installed; vector path comparison not run.")
+        return
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        session_id = "smoke_paths"
+        quantized = VectorStore(Path(tmp) / "vectors.sqlite3", high_precision=False)
+        exact = VectorStore(Path(tmp) / "vectors.sqlite3", high_precision=True)
+        records = _random_records(rng, 0, 300)
+        quantized.upsert(session_id, records)
+
+        # Batch encoding writes the same bytes as the per-record helpers
+        embeddings = [r["embedding"] for r in records[:20]]
+        expected_rows = [(*vsmod._encode_embedding(e), *vsmod._quantize(e)) for e in embeddings]
+        for got, want in zip(vsmod._encode_batch(embeddings), expected_rows):
+            assert got[0] == want[0] and got[2] == want[2], "batch encoding bytes differ"
+            assert math.isclose(got[1], want[1], rel_tol=1e-9) and math.isclose(got[3], want[3], rel_tol=1e-9)
+
+        queries = [[rng.gauss(0.0, 1.0) for _ in range(64)] for _ in range(5)]
+        for query in queries:
+            reference = _pure_python_scores(quantized, session_id, query)
+            _assert_matches(exact.score(session_id, query, top_k=10), reference, 10, 2e-3, "float16")
+            _assert_matches(quantized.score(session_id, query, top_k=10), reference, 10, 2e-2, "int8")
+
+        if vsmod.hnswlib is None:
+            print("SKIP: hnswlib not installed; ANN path comparison not run.")
+        else:
+            saved_threshold = vsmod.ANN_THRESHOLD
+            vsmod.ANN_THRESHOLD = 100
+            try:
+                ann = VectorStore(Path(tmp) / "vectors.sqlite3", high_precision=True)
+                for round_ in range(2):  # second round goes through the incremental index update
+                    for query in queries:
+                        reference = _pure_python_scores(ann, session_id, query)
+                        _assert_matches(ann.score(session_id, query, top_k=10), reference, 10, 2e-3, "hnsw")
+                    ann.upsert(session_id, _random_records(rng, 300 + 50 * round_, 50))
+                ann.score(session_id, queries[0], top_k=10)
+                # Re-upserting the newest chunks keeps their position but must not keep their old vectors
+                tail = _random_records(random.Random(11), 395, 5)
+                for record in tail:
+                    record["embedding"] = list(queries[0])
+                ann.upsert(session_id, tail)
+                for query in queries:
+                    reference = _pure_python_scores(ann, session_id, query)
+                    _assert_matches(ann.score(session_id, query, top_k=10), reference, 10, 2e-3, "hnsw replaced tail")
+            finally:
+                vsmod.ANN_THRESHOLD = saved_threshold
+    print("OK: numpy vector paths match the pure-Python ranking.")
+
+
 def run() -> None:
     # Monkeypatch embeddings to avoid network
     embmod.embed_texts = _fake_embed_texts  # type: ignore[assignment]
@@ -96,6 +185,8 @@ def run() -> None:
 
     print("OK: smoke multimodal retrieval passed.")
 
+    check_numpy_paths()
+
 
 if __name__ == "__main__":
     run()
@@ -1,7 +1,7 @@
 from .search_arxiv import search_arxiv
 from .fetch import fetch_html, discover_pdf_url, download_file
 from .parse_pdf import parse_pdf_text
-from .retrieval import keyword_retrieve, vector_retrieve, multimodal_retrieve
+from .retrieval import KeywordIndex, keyword_retrieve, vector_retrieve, multimodal_retrieve
 from .multimodal_parser import extract_figures_and_tables
 from .embeddings import embed_texts
 
@@ -11,6 +11,7 @@ __all__ = [
     "discover_pdf_url",
     "download_file",
     "parse_pdf_text",
+    "KeywordIndex",
     "keyword_retrieve",
     "vector_retrieve",
     "multimodal_retrieve",
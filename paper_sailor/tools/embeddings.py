@@ -1,30 +1,127 @@
 from __future__ import annotations
 
-import json
-import urllib.error
-import urllib.request
-from typing import Iterable, List
+import hashlib
+import http.client
+import sqlite3
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Sequence
 
-from ..config import get_openai_settings
+from .. import _http, _jsonio
+from ..config import OpenAISettings, get_openai_settings
+from ..storage import DATA_DIR
 
 
 USER_AGENT = "paper-sailor/0.2"
+MAX_INPUTS_PER_REQUEST = 256
+MAX_CONCURRENT_REQUESTS = 4
+CACHE_PATH = DATA_DIR / "embedding_cache.sqlite3"
 
+# Per-thread connection to CACHE_PATH, opened (and the table created) on first use
+_local = threading.local()
 
-def embed_texts(texts: Iterable[str], model: str | None = None) -> List[List[float]]:
+
+def embed_texts(texts: Iterable[str], model: str | None = None) -> List[Sequence[float]]:
+    """Embed ``texts``; each vector is a compact float32 ``array('f')`` (a sequence of floats).
+
+    Vectors are cached on disk (``CACHE_PATH``) per model and text, so repeated texts are
+    only sent to the API once, across runs. With ``embedding_dimensions`` configured the
+    API returns shortened (Matryoshka) vectors of that size.
+    """
     texts = [t for t in texts if isinstance(t, str) and t.strip()]
     if not texts:
         return []
 
     settings = get_openai_settings()
-    if not settings.api_key:
-        raise RuntimeError("OpenAI API key missing; set OPENAI_API_KEY or config.openai.api_key")
+    model = model or settings.embedding_model
+    cache_model = _cache_model(model, settings)
+    vectors = _cache_lookup(cache_model, texts)
+    missing = list(dict.fromkeys(t for t in texts if t not in vectors))
+    if missing:
+        if not settings.api_key:
+            raise RuntimeError("OpenAI API key missing; set OPENAI_API_KEY or config.openai.api_key")
+        fresh = dict(zip(missing, _embed_all(settings, model, missing)))
+        _cache_store(cache_model, fresh)
+        vectors.update(fresh)
+    return [vectors[t] for t in texts if t in vectors]
+
+
+def _cache_model(model: str, settings: OpenAISettings) -> str:
+    """Cache key for vectors of ``model`` at the configured output size."""
+    dims = settings.embedding_dimensions
+    return f"{model}@{dims}" if dims else model
+
+
+def _embed_all(settings: OpenAISettings, model: str, texts: List[str]) -> List[Sequence[float]]:
+    if len(texts) <= MAX_INPUTS_PER_REQUEST:
+        return _embed_batch(settings, model, texts)
+
+    # Split oversized inputs into per-request batches and send them concurrently (order preserved)
+    batches = [texts[i : i + MAX_INPUTS_PER_REQUEST] for i in range(0, len(texts), MAX_INPUTS_PER_REQUEST)]
+    with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_REQUESTS, len(batches))) as pool:
+        results = pool.map(lambda batch: _embed_batch(settings, model, batch), batches)
+        return [emb for batch_embs in results for emb in batch_embs]
+
+
+def _text_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _connect() -> sqlite3.Connection:
+    """This thread's cache connection; used as ``with _connect() as conn:`` per transaction."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(CACHE_PATH)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors ("
+            "text_hash BLOB NOT NULL, model TEXT NOT NULL, vec BLOB NOT NULL, PRIMARY KEY (text_hash, model))"
+        )
+        _local.conn = conn
+    return conn
+
 
-    target = settings.base_url.rstrip("/") + "/embeddings"
-    payload = json.dumps({
-        "model": model or settings.embedding_model,
+def _cache_lookup(model: str, texts: List[str]) -> Dict[str, Sequence[float]]:
+    keys = {_text_key(t): t for t in texts}
+    found: Dict[str, Sequence[float]] = {}
+    hashes = list(keys)
+    try:
+        with _connect() as conn:
+            for i in range(0, len(hashes), 500):
+                part = hashes[i : i + 500]
+                rows = conn.execute(
+                    f"SELECT text_hash, vec FROM vectors WHERE model = ? AND text_hash IN ({','.join('?' * len(part))})",
+                    (model, *part),
+                ).fetchall()
+                for text_hash, vec in rows:
+                    found[keys[bytes(text_hash)]] = array("f", bytes(vec))
+    except sqlite3.Error:
+        return {}  # no cache yet (or unreadable); embed everything
+    return found
+
+
+def _cache_store(model: str, vectors: Dict[str, Sequence[float]]) -> None:
+    rows = [(_text_key(t), model, array("f", vec).tobytes()) for t, vec in vectors.items()]
+    if not rows:
+        return
+    try:
+        with _connect() as conn:
+            conn.executemany("REPLACE INTO vectors (text_hash, model, vec) VALUES (?, ?, ?)", rows)
+    except sqlite3.Error:
+        pass  # the disk cache is best-effort
+
+
+def _embed_batch(settings: OpenAISettings, model: str, texts: List[str]) -> List[Sequence[float]]:
+    target = settings.embeddings_endpoint
+    request_body = {
+        "model": model,
         "input": texts,
-    }).encode("utf-8")
+    }
+    if settings.embedding_dimensions:
+        request_body["dimensions"] = settings.embedding_dimensions
+    payload = _jsonio.dumps(request_body)
 
     headers = {
         "Content-Type": "application/json",
@@ -33,29 +130,29 @@ def embed_texts(texts: Iterable[str], model: str | None = None) -> List[List[flo
     }
     headers.update(settings.extra_headers)
 
-    req = urllib.request.Request(target, data=payload, headers=headers)
     try:
-        with urllib.request.urlopen(req, timeout=settings.timeout) as resp:
-            body = resp.read()
-    except urllib.error.HTTPError as exc:
-        detail = exc.read().decode("utf-8", errors="ignore")
-        raise RuntimeError(f"Embedding request failed: {exc.code} {exc.reason}: {detail}") from exc
-    except urllib.error.URLError as exc:  # pragma: no cover - depends on network
+        resp = _http.post(target, payload, headers=headers, timeout=settings.timeout)
+    except (OSError, http.client.HTTPException) as exc:  # pragma: no cover - depends on network
         raise RuntimeError(f"Embedding request failed: {exc}") from exc
+    if resp.status >= 400:
+        detail = resp.body.decode("utf-8", errors="ignore")
+        raise RuntimeError(f"Embedding request failed: {resp.status} {resp.reason}: {detail}")
+    body = resp.body
 
-    data = json.loads(body)
+    data = _jsonio.loads(body)
     if not isinstance(data, dict) or "data" not in data:
         raise RuntimeError(f"Unexpected embedding response: {data}")
 
-    embeddings: List[List[float]] = []
+    embeddings: List[Sequence[float]] = []
     for item in data.get("data", []):
         emb = item.get("embedding")
         if isinstance(emb, list):
-            embeddings.append([float(x) for x in emb])
+            # 4 bytes per component instead of a boxed float; converted in C
+            embeddings.append(array("f", emb))
     return embeddings
 
 
-def embed_multimodal(items: Iterable[dict], model: str | None = "text-embedding-3-large") -> List[List[float]]:
+def embed_multimodal(items: Iterable[dict], model: str | None = "text-embedding-3-large") -> List[Sequence[float]]:
     """Generate embeddings for multimodal items by embedding their textual descriptions.
 
     Each item can be one of:
@@ -1,29 +1,101 @@
 from __future__ import annotations
 
+import hashlib
 import re
+import shutil
+import threading
 import urllib.parse
-import urllib.request
 from html.parser import HTMLParser
-from typing import Optional
+from pathlib import Path
+from typing import Dict, Optional, Tuple
 
+from .. import _http
 from ..storage import pdf_path
 
+try:  # Optional dependency
+    from selectolax.lexbor import LexborHTMLParser  # type: ignore
+except Exception:  # pragma: no cover - optional import
+    LexborHTMLParser = None  # type: ignore
+
 
 USER_AGENT = "paper-sailor/0.2"
+DISCOVER_CACHE_SIZE = 512
+MAX_DOWNLOADS_PER_HOST = 4
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# (sha1(html), base_url) -> discovered PDF url; landing pages often repeat verbatim
+_DISCOVER_CACHE: Dict[Tuple[bytes, str], Optional[str]] = {}
+# normalized source url -> local file already written by download_file in this process
+_DOWNLOADED: Dict[str, Path] = {}
+_DOWNLOADED_LOCK = threading.Lock()
+_HOST_SLOTS: Dict[str, threading.BoundedSemaphore] = {}
+_ARXIV_HOSTS = frozenset({"arxiv.org", "www.arxiv.org"})
+
+_META_PDF_RE = re.compile(r'<meta[^>]+name=["\']citation_pdf_url["\'][^>]+content=["\']([^"\']+)["\']', re.I)
+_HREF_PDF_RE = re.compile(r'href=["\']([^"\']+\.pdf)["\']', re.I)
+
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    """Per-host semaphore so parallel callers stay within arXiv-friendly concurrency."""
+    host = urllib.parse.urlsplit(url).netloc.lower()
+    with _DOWNLOADED_LOCK:
+        slot = _HOST_SLOTS.get(host)
+        if slot is None:
+            slot = _HOST_SLOTS[host] = threading.BoundedSemaphore(MAX_DOWNLOADS_PER_HOST)
+    return slot
+
+
+def _export_mirror(url: str) -> str:
+    """Point arxiv.org downloads at export.arxiv.org, the host arXiv asks automated clients to use."""
+    parts = urllib.parse.urlsplit(url)
+    if parts.netloc.lower() in _ARXIV_HOSTS:
+        return urllib.parse.urlunsplit(parts._replace(netloc="export.arxiv.org"))
+    return url
+
+
+def _normalize_url(url: str) -> str:
+    parts = urllib.parse.urlsplit(url.strip())
+    return urllib.parse.urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, ""))
 
 
 def fetch_html(url: str, timeout: float = 20) -> Optional[str]:
-    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            ctype = resp.headers.get("Content-Type", "").lower()
-            if "html" not in ctype:
-                return None
-            encoding = resp.headers.get_content_charset() if hasattr(resp.headers, "get_content_charset") else None
-            raw = resp.read()
-            return raw.decode(encoding or "utf-8", errors="ignore")
+        resp = _http.get(url, headers={"User-Agent": USER_AGENT}, timeout=timeout)
     except Exception:
         return None
+    if resp.status >= 400:
+        return None
+    ctype = resp.headers.get("Content-Type", "").lower()
+    if "html" not in ctype:
+        return None
+    encoding = resp.headers.get_content_charset()
+    return resp.body.decode(encoding or "utf-8", errors="ignore")
+
+
+def _pdf_link(tag: str, attr: Dict[str, Optional[str]]) -> Optional[str]:
+    """Return the PDF link a start tag points at (unresolved), if any. ``attr`` keys are lowercase."""
+    tag = tag.lower()
+    href = attr.get("href") or attr.get("data-href") or attr.get("data-pdf")
+    if tag in {"meta", "link"}:
+        name = (attr.get("name") or "").lower()
+        if name == "citation_pdf_url" and attr.get("content"):
+            return attr["content"]
+        if (attr.get("type") or "").lower() == "application/pdf" and href:
+            return href
+
+    if tag != "a" or not href:
+        return None
+    type_attr = (attr.get("type") or "").lower()
+    aria = (attr.get("aria-label") or "").lower()
+    title = (attr.get("title") or "").lower()
+    text_hint = "pdf" in aria or "pdf" in title
+    if href.lower().endswith(".pdf") or "pdf" in type_attr or text_hint:
+        return href
+    return None
+
+
+class _Found(Exception):
+    """Raised by _PdfLinkParser to stop feeding once a PDF link is known."""
 
 
 class _PdfLinkParser(HTMLParser):
@@ -33,79 +105,107 @@ class _PdfLinkParser(HTMLParser):
         self.result: Optional[str] = None
 
     def handle_starttag(self, tag: str, attrs):  # type: ignore[override]
-        if self.result is not None:
-            return
-        attr = {k.lower(): v for k, v in attrs}
-        href = attr.get("href") or attr.get("data-href") or attr.get("data-pdf")
-        if tag.lower() in {"meta", "link"}:
-            name = attr.get("name", "").lower()
-            if name == "citation_pdf_url" and attr.get("content"):
-                self.result = urllib.parse.urljoin(self.base, attr["content"])
-                return
-            if attr.get("type", "").lower() == "application/pdf" and href:
-                self.result = urllib.parse.urljoin(self.base, href)
-                return
-
-        if tag.lower() != "a":
-            return
-        type_attr = attr.get("type", "").lower()
-        aria = attr.get("aria-label", "").lower()
-        title = attr.get("title", "").lower()
-        text_hint = "pdf" in aria or "pdf" in title
-        if not href:
-            return
-        if href.lower().endswith(".pdf") or "pdf" in type_attr or text_hint:
+        href = _pdf_link(tag, {k.lower(): v for k, v in attrs})
+        if href:
             self.result = urllib.parse.urljoin(self.base, href)
+            raise _Found
+
+
+def _find_pdf_link(html: str, base_url: str) -> Optional[str]:
+    """First PDF link among meta/link/a tags in document order."""
+    if LexborHTMLParser is not None:
+        try:
+            for node in LexborHTMLParser(html).css("meta, link, a"):
+                href = _pdf_link(node.tag, {k.lower(): v for k, v in node.attributes.items()})
+                if href:
+                    return urllib.parse.urljoin(base_url, href)
+            return None
+        except Exception:
+            pass  # fall back to the pure-Python parser
+    parser = _PdfLinkParser(base_url)
+    try:
+        parser.feed(html)
+    except _Found:
+        pass
+    except Exception:
+        parser.result = None
+    return parser.result
 
 
 def discover_pdf_url(html: str, base_url: str) -> Optional[str]:
-    meta_match = re.search(r'<meta[^>]+name=["\']citation_pdf_url["\'][^>]+content=["\']([^"\']+)["\']', html, flags=re.I)
+    key = (hashlib.sha1(html.encode("utf-8", errors="ignore")).digest(), base_url)
+    if key in _DISCOVER_CACHE:
+        return _DISCOVER_CACHE[key]
+    result = _discover_pdf_url(html, base_url)
+    if len(_DISCOVER_CACHE) >= DISCOVER_CACHE_SIZE:
+        _DISCOVER_CACHE.pop(next(iter(_DISCOVER_CACHE)), None)
+    _DISCOVER_CACHE[key] = result
+    return result
+
+
+def _discover_pdf_url(html: str, base_url: str) -> Optional[str]:
+    meta_match = _META_PDF_RE.search(html)
     if meta_match:
         return urllib.parse.urljoin(base_url, meta_match.group(1))
 
-    parser = _PdfLinkParser(base_url)
-    try:
-        parser.feed(html)
-    except Exception:
-        parser.result = None
-    if parser.result:
-        return parser.result
+    found = _find_pdf_link(html, base_url)
+    if found:
+        return found
 
     # Fallback: regex search for .pdf links
-    pdf_matches = re.findall(r'href=["\']([^"\']+\.pdf)["\']', html, flags=re.I)
-    for href in pdf_matches:
-        return urllib.parse.urljoin(base_url, href)
+    href_match = _HREF_PDF_RE.search(html)
+    if href_match:
+        return urllib.parse.urljoin(base_url, href_match.group(1))
     return None
 
 
 def download_file(url: str, paper_id: str, kind: str = "pdf", max_bytes: int = 100 * 1024 * 1024) -> Optional[str]:
     """Download a file (PDF) to data dir, returns local path or None.
 
-    Uses stdlib urllib only; sets UA and a basic size guard.
+    Streams over the shared keep-alive pool (arxiv.org links via export.arxiv.org); sets
+    UA and a basic size guard.
     """
     if kind == "pdf":
         out_path = pdf_path(paper_id)
     else:
         raise ValueError(f"Unsupported kind: {kind}")
 
-    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    source = _normalize_url(url)
+    with _DOWNLOADED_LOCK:
+        previous = _DOWNLOADED.get(source)
+    if previous is not None and previous.exists():
+        # Same document already fetched (e.g. mirrored ids); reuse the bytes on disk
+        try:
+            if previous != out_path:
+                shutil.copyfile(previous, out_path)
+            return str(out_path)
+        except OSError:
+            pass  # fall through to a fresh download
+
+    target = _export_mirror(url)
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
+        with _host_slot(target), _http.stream(target, headers={"User-Agent": USER_AGENT}, timeout=30) as resp:
+            if resp.status >= 400:
+                return None
             ctype = resp.headers.get("Content-Type", "").lower()
             if kind == "pdf" and "pdf" not in ctype and not url.lower().endswith(".pdf"):
                 # Not a PDF, skip
                 return None
             total = 0
+            buf = bytearray(DOWNLOAD_CHUNK_SIZE)
+            view = memoryview(buf)
             out_path.parent.mkdir(parents=True, exist_ok=True)
             with open(out_path, "wb") as f:
                 while True:
-                    chunk = resp.read(8192)
-                    if not chunk:
+                    n = resp.readinto(buf)
+                    if not n:
                         break
-                    total += len(chunk)
+                    total += n
                     if total > max_bytes:
                         return None
-                    f.write(chunk)
+                    f.write(view[:n])
+        with _DOWNLOADED_LOCK:
+            _DOWNLOADED[source] = out_path
         return str(out_path)
     except Exception:
         return None
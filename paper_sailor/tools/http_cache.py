@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import http.client
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+
+from .. import _http
+from ..storage import DATA_DIR
+
+
+CACHE_PATH = DATA_DIR / "http_cache.sqlite3"
+CACHE_TTL = 600  # seconds a response is served without revalidation
+
+# Per-thread connection to CACHE_PATH, opened (and the table created) on first use
+_local = threading.local()
+
+
+def cached_get(
+    url: str,
+    *,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 20.0,
+    ttl: int = CACHE_TTL,
+) -> _http.Response:
+    """GET through an on-disk response cache (``CACHE_PATH``).
+
+    Responses younger than ``ttl`` seconds are returned without touching the network;
+    older ones are revalidated with If-None-Match / If-Modified-Since and a 304 refreshes
+    the cached copy. Only 200 responses are stored.
+    """
+    now = int(time.time())
+    cached = _lookup(url)
+    if cached is not None:
+        fetched_at, etag, last_modified, body = cached
+        if now - fetched_at < ttl:
+            return _http.Response(200, "OK", http.client.HTTPMessage(), body)
+        headers = dict(headers or {})
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    resp = _http.get(url, headers=headers, timeout=timeout)
+    if resp.status == 304 and cached is not None:
+        _touch(url, now)
+        return _http.Response(200, "OK", resp.headers, cached[3])
+    if resp.status == 200:
+        _store(url, now, resp.headers.get("ETag"), resp.headers.get("Last-Modified"), resp.body)
+    return resp
+
+
+def _connect() -> sqlite3.Connection:
+    """This thread's cache connection; used as ``with _connect() as conn:`` per transaction."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(CACHE_PATH)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, fetched_at INTEGER NOT NULL, etag TEXT, last_modified TEXT, body BLOB NOT NULL)"
+        )
+        _local.conn = conn
+    return conn
+
+
+def _lookup(url: str) -> Optional[Tuple[int, Optional[str], Optional[str], bytes]]:
+    try:
+        with _connect() as conn:
+            row = conn.execute(
+                "SELECT fetched_at, etag, last_modified, body FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+    except sqlite3.Error:
+        return None
+    if row is None:
+        return None
+    fetched_at, etag, last_modified, body = row
+    return fetched_at, etag, last_modified, zlib.decompress(body)
+
+
+def _store(url: str, now: int, etag: Optional[str], last_modified: Optional[str], body: bytes) -> None:
+    try:
+        with _connect() as conn:
+            conn.execute(
+                "REPLACE INTO responses (url, fetched_at, etag, last_modified, body) VALUES (?, ?, ?, ?, ?)",
+                (url, now, etag, last_modified, zlib.compress(body, 1)),
+            )
+    except sqlite3.Error:
+        pass  # the disk cache is best-effort
+
+
+def _touch(url: str, now: int) -> None:
+    try:
+        with _connect() as conn:
+            conn.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (now, url))
+    except sqlite3.Error:
+        pass
@@ -1,28 +1,72 @@
 from __future__ import annotations
 
 import base64
+import hashlib
+import multiprocessing
+import os
+import threading
 from typing import Dict, List, Optional, Tuple
 import io
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 try:  # Optional dependency
     import fitz  # type: ignore
 except Exception:  # pragma: no cover - optional import
     fitz = None  # type: ignore
 
-import json
-import urllib.error
-import urllib.request
+try:  # Optional dependency
+    from PIL import Image  # type: ignore
+except Exception:  # pragma: no cover - optional import
+    Image = None  # type: ignore
+
+import http.client
 
+from .. import _http, _jsonio
 from ..config import get_openai_settings, get_vision_settings
 
 USER_AGENT = "paper-sailor/0.3"
+# detail="low" requests are downsampled to 512px server-side; larger uploads are wasted bytes
+VISION_MAX_EDGE = 512
+# Image decoding holds the GIL, so large PDFs are split across processes in page ranges
+PAGES_PER_PROCESS = 8
+# Total extraction processes, shared by every PDF being parsed concurrently
+MAX_EXTRACT_PROCESSES = min(os.cpu_count() or 1, 4)
+
+# Spawned (not forked: callers run in threads that may hold locks) on first use
+_EXTRACT_POOL: Optional[ProcessPoolExecutor] = None
+_EXTRACT_POOL_LOCK = threading.Lock()
+VISION_PROMPT = (
+    "You are describing a figure or table from a scientific paper. "
+    "Provide a concise description with: what it shows, axes/units (if any), key values/trends, "
+    "and any notable observations. Keep it under 120 words.\n"
+)
 
 
 def _b64_bytes(data: bytes) -> str:
     return base64.b64encode(data).decode("ascii")
 
 
+def _shrink_image(image_bytes: bytes) -> Tuple[bytes, str]:
+    """Downscale to VISION_MAX_EDGE and re-encode as JPEG when Pillow is available.
+
+    Returns (bytes, mime type); the input is passed through unchanged if Pillow is
+    missing, the image cannot be decoded, or re-encoding would not make it smaller.
+    """
+    if Image is None:
+        return image_bytes, "image/png"
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as im:
+            im.thumbnail((VISION_MAX_EDGE, VISION_MAX_EDGE))
+            buf = io.BytesIO()
+            im.convert("RGB").save(buf, "JPEG", quality=80, optimize=True)
+    except Exception:
+        return image_bytes, "image/png"
+    small = buf.getvalue()
+    if len(small) >= len(image_bytes):
+        return image_bytes, "image/png"
+    return small, "image/jpeg"
+
+
 def describe_visual_with_gpt4v(image_bytes: bytes, *, context: str = "") -> str:
     """Call a vision-capable chat model to describe an image (figure/table).
 
@@ -33,13 +77,10 @@ def describe_visual_with_gpt4v(image_bytes: bytes, *, context: str = "") -> str:
     if not settings.api_key:
         raise RuntimeError("OpenAI API key missing; set OPENAI_API_KEY or config.openai.api_key")
 
-    target = settings.base_url.rstrip("/") + "/chat/completions"
-    image_url = f"data:image/png;base64,{_b64_bytes(image_bytes)}"
-    prompt = (
-        "You are describing a figure or table from a scientific paper. "
-        "Provide a concise description with: what it shows, axes/units (if any), key values/trends, "
-        "and any notable observations. Keep it under 120 words.\n"
-    )
+    target = settings.chat_endpoint
+    image_bytes, mime = _shrink_image(image_bytes)
+    image_url = f"data:{mime};base64,{_b64_bytes(image_bytes)}"
+    prompt = VISION_PROMPT
     if context:
         prompt += f"Context: {context.strip()}\n"
     payload = {
@@ -56,25 +97,23 @@ def describe_visual_with_gpt4v(image_bytes: bytes, *, context: str = "") -> str:
             }
         ],
     }
-    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    data = _jsonio.dumps(payload)
     headers = {
         "Content-Type": "application/json",
         "Authorization": f"Bearer {settings.api_key}",
         "User-Agent": USER_AGENT,
     }
     headers.update(settings.extra_headers)
-    req = urllib.request.Request(target, data=data, headers=headers)
     timeout = max(float(settings.timeout or 0), 60.0)
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            body = resp.read()
-    except urllib.error.HTTPError as exc:  # pragma: no cover - network dependent
-        detail = exc.read().decode("utf-8", errors="ignore")
-        raise RuntimeError(f"Vision describe failed: {exc.code} {exc.reason}: {detail}") from exc
-    except urllib.error.URLError as exc:  # pragma: no cover
+        resp = _http.post(target, data, headers=headers, timeout=timeout)
+    except (OSError, http.client.HTTPException) as exc:  # pragma: no cover
         raise RuntimeError(f"Vision describe failed: {exc}") from exc
+    if resp.status >= 400:  # pragma: no cover - network dependent
+        detail = resp.body.decode("utf-8", errors="ignore")
+        raise RuntimeError(f"Vision describe failed: {resp.status} {resp.reason}: {detail}")
 
-    result = json.loads(body)
+    result = _jsonio.loads(resp.body)
     try:
         return (result.get("choices", [{}])[0].get("message", {}) or {}).get("content", "").strip()
     except Exception:
@@ -98,6 +137,54 @@ def _extract_page_images(doc, page_index: int) -> List[Tuple[int, bytes, str]]:
     return images
 
 
+def _extract_images_range(pdf_path: str, start: int, stop: int) -> List[Tuple[int, List[Tuple[int, bytes, str]]]]:
+    """Process-pool worker: open the PDF once and extract images for pages [start, stop)."""
+    doc = fitz.open(pdf_path)
+    try:
+        return [(page_index, _extract_page_images(doc, page_index)) for page_index in range(start, stop)]
+    finally:
+        doc.close()
+
+
+def _extract_pool() -> ProcessPoolExecutor:
+    global _EXTRACT_POOL
+    with _EXTRACT_POOL_LOCK:
+        if _EXTRACT_POOL is None:
+            _EXTRACT_POOL = ProcessPoolExecutor(
+                max_workers=MAX_EXTRACT_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _EXTRACT_POOL
+
+
+def _reset_extract_pool(pool: ProcessPoolExecutor) -> None:
+    global _EXTRACT_POOL
+    with _EXTRACT_POOL_LOCK:
+        if _EXTRACT_POOL is pool:
+            _EXTRACT_POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _collect_page_images(
+    doc, pdf_path: str, pages: int, verbose: bool = False
+) -> List[Tuple[int, List[Tuple[int, bytes, str]]]]:
+    """Return (page_index, images) for the first ``pages`` pages, in page order."""
+    workers = min(MAX_EXTRACT_PROCESSES, pages // PAGES_PER_PROCESS)
+    if workers >= 2:
+        step = -(-pages // workers)
+        starts = list(range(0, pages, step))
+        stops = [min(start + step, pages) for start in starts]
+        pool = _extract_pool()
+        try:
+            parts = pool.map(_extract_images_range, [pdf_path] * len(starts), starts, stops)
+            return [entry for part in parts for entry in part]
+        except Exception as exc:
+            if verbose:
+                print(f"   ⚠️ Parallel image extraction failed ({exc!r}); extracting in-process")
+            _reset_extract_pool(pool)
+    return [(page_index, _extract_page_images(doc, page_index)) for page_index in range(pages)]
+
+
 def _extract_page_tables(page) -> List[Tuple[int, Optional[str]]]:
     """Attempt to extract tables; returns list of (page_number, markdown_or_none)."""
     out: List[Tuple[int, Optional[str]]] = []
@@ -133,12 +220,14 @@ def _extract_page_tables(page) -> List[Tuple[int, Optional[str]]]:
     return out
 
 
-def _describe_image_task(args: Tuple) -> Tuple[int, str, Optional[str]]:
+def _describe_image_task(args: Tuple, cancel: Optional[threading.Event] = None) -> Tuple[int, str, Optional[str]]:
     """Helper function for parallel image description.
     
-    Returns: (image_index, context, description_or_none)
+    Returns: (image_index, context, description_or_none); no API call once ``cancel`` is set.
     """
     idx, img_bytes, context = args
+    if cancel is not None and cancel.is_set():
+        return (idx, context, None)
     try:
         desc = describe_visual_with_gpt4v(img_bytes, context=context)
         return (idx, context, desc)
@@ -153,7 +242,8 @@ def extract_figures_and_tables(
     verbose: bool = False, 
     max_pages: int = None,
     extract_tables: bool = False,
-    max_workers: int = 4
+    max_workers: int = 4,
+    cancel: Optional[threading.Event] = None,
 ) -> List[Dict]:
     """Extract figures (and optionally tables) with parallel vision API calls.
     
@@ -164,6 +254,7 @@ def extract_figures_and_tables(
         max_pages: Maximum number of pages to process (None = all pages)
         extract_tables: Whether to extract tables (default: False, only figures)
         max_workers: Number of parallel workers for vision API calls (default: 4)
+        cancel: Once set, vision calls that have not started yet are skipped
     """
     if fitz is None:
         if verbose:
@@ -176,6 +267,36 @@ def extract_figures_and_tables(
             print(f"   ⚠️ Failed to open PDF: {exc}")
         return []
 
+    try:
+        return _extract_from_doc(
+            doc,
+            pdf_path,
+            paper_id,
+            verbose=verbose,
+            max_pages=max_pages,
+            extract_tables=extract_tables,
+            max_workers=max_workers,
+            cancel=cancel,
+        )
+    finally:
+        try:
+            doc.close()
+        except Exception:
+            pass
+
+
+def _extract_from_doc(
+    doc,
+    pdf_path: str,
+    paper_id: str,
+    *,
+    verbose: bool,
+    max_pages: Optional[int],
+    extract_tables: bool,
+    max_workers: int,
+    cancel: Optional[threading.Event] = None,
+) -> List[Dict]:
+    """Body of extract_figures_and_tables; one open document serves the image and table passes."""
     total_pages = len(doc)
     pages_to_process = min(max_pages, total_pages) if max_pages else total_pages
     
@@ -185,25 +306,17 @@ def extract_figures_and_tables(
     # Step 1: Collect all images from all pages
     all_images: List[Tuple[int, int, bytes, str]] = []  # (page_index, page_num, img_bytes, ext)
     
-    try:
-        for page_index in range(pages_to_process):
-            page_images = _extract_page_images(doc, page_index)
-            
-            for page_num, img_bytes, ext in page_images:
-                if len(img_bytes) < 1000:  # Skip very small images
-                    if verbose:
-                        print(f"   ⏭️  Page {page_index+1}: Skipping small image ({len(img_bytes)} bytes)")
-                    continue
-                all_images.append((page_index, page_num, img_bytes, ext))
-            
-            if verbose and page_images:
-                filtered_count = sum(1 for _, img, _ in page_images if len(img) >= 1000)
-                print(f"   📸 Page {page_index+1}: Found {filtered_count} images (skipped {len(page_images) - filtered_count} small)")
-    finally:
-        try:
-            doc.close()
-        except Exception:
-            pass
+    for page_index, page_images in _collect_page_images(doc, pdf_path, pages_to_process, verbose):
+        for page_num, img_bytes, ext in page_images:
+            if len(img_bytes) < 1000:  # Skip very small images
+                if verbose:
+                    print(f"   ⏭️  Page {page_index+1}: Skipping small image ({len(img_bytes)} bytes)")
+                continue
+            all_images.append((page_index, page_num, img_bytes, ext))
+
+        if verbose and page_images:
+            filtered_count = sum(1 for _, img, _ in page_images if len(img) >= 1000)
+            print(f"   📸 Page {page_index+1}: Found {filtered_count} images (skipped {len(page_images) - filtered_count} small)")
     
     if verbose:
         print(f"\n   📊 Total images to process: {len(all_images)}")
@@ -213,26 +326,39 @@ def extract_figures_and_tables(
     items: List[Dict] = []
     
     if all_images:
+        # Identical images (logos, repeated sub-figures) are described once: idx of first copy -> all copies
+        duplicates: Dict[int, List[int]] = {}
+        first_by_digest: Dict[bytes, int] = {}
+        for idx, (_, _, img_bytes, _) in enumerate(all_images):
+            digest = hashlib.blake2b(img_bytes, digest_size=16).digest()
+            first = first_by_digest.setdefault(digest, idx)
+            duplicates.setdefault(first, []).append(idx)
+
         # Prepare tasks for parallel processing
         tasks = []
-        for idx, (page_index, page_num, img_bytes, ext) in enumerate(all_images):
+        for idx in duplicates:
+            page_index, page_num, img_bytes, ext = all_images[idx]
             context = f"Paper {paper_id}, page {page_num}"
             tasks.append((idx, img_bytes, context))
+
+        if verbose and len(tasks) < len(all_images):
+            print(f"   ♻️  {len(all_images) - len(tasks)} duplicate images reuse another image's description")
         
         # Execute in parallel
         descriptions = {}
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {executor.submit(_describe_image_task, task): task[0] for task in tasks}
+            futures = {executor.submit(_describe_image_task, task, cancel): task[0] for task in tasks}
             
             completed = 0
             for future in as_completed(futures):
                 idx, context, desc = future.result()
-                descriptions[idx] = desc
+                for copy_idx in duplicates[idx]:
+                    descriptions[copy_idx] = desc
                 completed += 1
                 
                 if verbose:
                     status = "✅" if desc else "⚠️"
-                    print(f"   {status} Progress: {completed}/{len(all_images)} - Image {idx+1}: {desc[:60] if desc else 'Failed'}...")
+                    print(f"   {status} Progress: {completed}/{len(tasks)} - Image {idx+1}: {desc[:60] if desc else 'Failed'}...")
         
         # Step 3: Build result items
         for idx, (page_index, page_num, img_bytes, ext) in enumerate(all_images):
@@ -255,7 +381,6 @@ def extract_figures_and_tables(
             print(f"\n   📊 Extracting tables...")
         
         try:
-            doc = fitz.open(pdf_path)
             for page_index in range(pages_to_process):
                 page = doc[page_index]
                 page_tables = _extract_page_tables(page)
@@ -276,11 +401,10 @@ def extract_figures_and_tables(
                         "content_type": "table",
                         "visual_description": text,
                     })
-        finally:
-            try:
-                doc.close()
-            except Exception:
-                pass
+        except Exception as exc:
+            # Keep the figures gathered so far
+            if verbose:
+                print(f"   ⚠️ Table extraction failed: {exc}")
     
     if verbose:
         figures = sum(1 for item in items if item.get("content_type") == "figure")
@@ -1,13 +1,24 @@
 from __future__ import annotations
 
-import json
+import threading
 import urllib.parse
-import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any, Dict, Iterable, Optional
 
+from .. import _jsonio
+from .http_cache import cached_get
+
 
 OPENALEX_API_BASE = "https://api.openalex.org"
 _USER_AGENT = "paper-sailor/0.1"
+CACHE_TTL = 30 * 24 * 3600  # seconds; work metadata changes rarely
+MEMORY_CACHE_SIZE = 4096
+ENRICH_CONCURRENCY = 8
+
+# url -> raw response bytes; decoded per call so callers never share a mutable dict
+_MEMORY_CACHE: "OrderedDict[str, bytes]" = OrderedDict()
+_MEMORY_LOCK = threading.Lock()
 
 
 class OpenAlexError(RuntimeError):
@@ -51,27 +62,49 @@ def fetch_work(
     params: Optional[Dict[str, Any]] = None,
     timeout: int = 20,
 ) -> Dict[str, Any]:
-    """Fetch a single OpenAlex work object."""
+    """Fetch a single OpenAlex work object.
+
+    Responses are cached in memory and, through ``http_cache.cached_get``, on disk for
+    ``CACHE_TTL`` seconds.
+    """
     url = _build_url(identifier, params=params)
-    req = urllib.request.Request(url, headers={"User-Agent": _USER_AGENT})
-    try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            if resp.status != 200:
-                raise OpenAlexError(f"OpenAlex returned status {resp.status}")
-            payload = resp.read()
-    except OpenAlexError:
-        raise
-    except Exception as exc:
-        raise OpenAlexError(f"Request to OpenAlex failed: {exc}") from exc
+    payload = _cached_payload(url)
+    fresh = payload is None
+    if payload is None:
+        try:
+            resp = cached_get(url, headers={"User-Agent": _USER_AGENT}, timeout=timeout, ttl=CACHE_TTL)
+        except Exception as exc:
+            raise OpenAlexError(f"Request to OpenAlex failed: {exc}") from exc
+        if resp.status != 200:
+            raise OpenAlexError(f"OpenAlex returned status {resp.status}")
+        payload = resp.body
     try:
-        data = json.loads(payload.decode("utf-8"))
+        data = _jsonio.loads(payload)
     except Exception as exc:
         raise OpenAlexError(f"Failed to decode OpenAlex response: {exc}") from exc
     if not isinstance(data, dict):
         raise OpenAlexError("OpenAlex response was not a JSON object")
+    if fresh:
+        _remember(url, payload)
     return data
 
 
+def _cached_payload(url: str) -> Optional[bytes]:
+    with _MEMORY_LOCK:
+        payload = _MEMORY_CACHE.get(url)
+        if payload is not None:
+            _MEMORY_CACHE.move_to_end(url)
+        return payload
+
+
+def _remember(url: str, payload: bytes) -> None:
+    with _MEMORY_LOCK:
+        _MEMORY_CACHE[url] = payload
+        _MEMORY_CACHE.move_to_end(url)
+        while len(_MEMORY_CACHE) > MEMORY_CACHE_SIZE:
+            _MEMORY_CACHE.popitem(last=False)
+
+
 def _select_fields(work: Dict[str, Any], concepts_limit: int = 8) -> Dict[str, Any]:
     concept_items = work.get("concepts") or []
     primary_concepts = []
@@ -105,20 +138,29 @@ def enrich_papers_with_openalex(
     *,
     timeout: int = 20,
     concepts_limit: int = 8,
+    max_workers: int = ENRICH_CONCURRENCY,
 ) -> None:
     """Augment paper dicts (mutates) with an 'openalex' metadata field."""
-    for paper in papers:
+    params = {"select": "id,display_name,doi,publication_year,publication_date,cited_by_count,referenced_works,related_works,concepts,primary_topic"}
+    papers = list(papers)
+    if not papers:
+        return
+
+    def lookup(paper: Dict[str, Any]) -> Dict[str, Any]:
         paper_id = str(paper.get("id") or "")
         identifier = paper_id.split(":", 1)[1] if ":" in paper_id else paper_id
-        try:
-            work = fetch_work(
-                identifier,
-                params={"select": "id,display_name,doi,publication_year,publication_date,cited_by_count,referenced_works,related_works,concepts,primary_topic"},
-                timeout=timeout,
-            )
-        except OpenAlexError:
-            paper.setdefault("warnings", []).append("openalex_lookup_failed")
-            continue
-        paper["openalex"] = _select_fields(work, concepts_limit=concepts_limit)
-        if work.get("doi") and not paper.get("doi"):
-            paper["doi"] = work.get("doi")
+        return fetch_work(identifier, params=params, timeout=timeout)
+
+    # Lookups overlap on the network; results are merged here, on the calling thread
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(papers)))) as pool:
+        futures = {pool.submit(lookup, paper): paper for paper in papers}
+        for future in as_completed(futures):
+            paper = futures[future]
+            try:
+                work = future.result()
+            except OpenAlexError:
+                paper.setdefault("warnings", []).append("openalex_lookup_failed")
+                continue
+            paper["openalex"] = _select_fields(work, concepts_limit=concepts_limit)
+            if work.get("doi") and not paper.get("doi"):
+                paper["doi"] = work.get("doi")
@@ -22,6 +22,12 @@ except Exception:  # pragma: no cover - optional import
 CHUNK_CHAR_LIMIT = 1000
 CHUNK_CHAR_MIN = 400
 
+_PARA_SPLIT_RE = re.compile(r"\n\s*\n")
+_BULLET_RE = re.compile(r"^[\-•\*]\s+")
+_BULLET_CHARS = "-•*"  # first characters _BULLET_RE can match
+_NUMBERED_HEADING_RE = re.compile(r"\d+(\.\d+)*\s+.+")
+_HEADING_KEYWORDS = frozenset({"abstract", "introduction", "conclusion", "related work", "method", "results"})
+
 
 @dataclass
 class _Paragraph:
@@ -37,10 +43,6 @@ def parse_pdf_text(local_pdf_path: str, *, paper_id: str) -> List[Dict]:
     if not pages:
         return []
 
-    paragraphs = list(_iter_paragraphs(pages))
-    if not paragraphs:
-        return []
-
     chunks: List[Dict] = []
     buffer: List[str] = []
     section: Optional[str] = None
@@ -48,13 +50,11 @@ def parse_pdf_text(local_pdf_path: str, *, paper_id: str) -> List[Dict]:
     chunk_index = 0
 
     def flush() -> None:
-        nonlocal buffer, section, page_start, chunk_index, current_len
+        nonlocal page_start, chunk_index, current_len
         if not buffer:
             return
-        text = " ".join(buffer).strip()
-        if not text:
-            buffer = []
-            return
+        # Buffered paragraphs are already stripped and non-empty
+        text = " ".join(buffer)
         chunk_index += 1
         chunk = {
             "id": f"{paper_id}:{chunk_index:04d}",
@@ -65,14 +65,14 @@ def parse_pdf_text(local_pdf_path: str, *, paper_id: str) -> List[Dict]:
             "text": text,
         }
         chunks.append(chunk)
-        buffer = []
+        buffer.clear()
         page_start = None
         current_len = 0
 
     current_len = 0
     current_page = 0
 
-    for para in paragraphs:
+    for para in _iter_paragraphs(pages):
         current_page = para.page
         cleaned = para.text.strip()
         if not cleaned:
@@ -137,31 +137,34 @@ def _extract_pages(path: str) -> List[Tuple[int, str]]:
 
 def _iter_paragraphs(pages: List[Tuple[int, str]]) -> Iterator[_Paragraph]:
     for page_num, text in pages:
-        cleaned = text.replace("\r", "\n")
-        blocks = re.split(r"\n\s*\n", cleaned)
-        for block in blocks:
-            lines = [re.sub(r"^[\-•\*]\s+", "", line).strip() for line in block.splitlines()]
-            lines = [line for line in lines if line]
+        cleaned = text.replace("\r", "\n") if "\r" in text else text
+        for block in _PARA_SPLIT_RE.split(cleaned):
+            lines: List[str] = []
+            for line in block.splitlines():
+                if line[:1] in _BULLET_CHARS:
+                    line = _BULLET_RE.sub("", line)
+                line = line.strip()
+                if line:
+                    lines.append(line)
             if not lines:
                 continue
-            paragraph = " ".join(lines)
-            yield _Paragraph(page=page_num, text=re.sub(r"\s+", " ", paragraph))
+            # split()/join collapses whitespace runs like \s+ -> " " without a regex pass
+            yield _Paragraph(page=page_num, text=" ".join(" ".join(lines).split()))
 
 
 def _maybe_heading(text: str) -> Optional[str]:
     candidate = text.strip()
-    if not candidate:
-        return None
-    candidate = candidate.replace("\n", " ")
+    # Cheap rejects first: most paragraphs are long prose
     if len(candidate) < 5 or len(candidate) > 120:
         return None
-    if candidate.lower() in {"abstract", "introduction", "conclusion", "related work", "method", "results"}:
+    candidate = candidate.replace("\n", " ")
+    if candidate.lower() in _HEADING_KEYWORDS:
         return candidate.title()
-    if candidate.endswith(":"):
+    if candidate[-1] == ":":
         return candidate.rstrip(":").strip().title()
-    if re.match(r"^\d+(\.\d+)*\s+.+", candidate):
+    if candidate[0].isdigit() and _NUMBERED_HEADING_RE.match(candidate):
         return candidate
-    letters = [ch for ch in candidate if ch.isalpha()]
-    if letters and sum(ch.isupper() for ch in letters) / len(letters) > 0.6:
+    letters = sum(map(str.isalpha, candidate))
+    if letters and sum(map(str.isupper, candidate)) / letters > 0.6:
         return candidate.title()
     return None
@@ -1,38 +1,275 @@
 from __future__ import annotations
 
+import heapq
+import math
+import operator
+import queue
 import re
-from typing import Dict, List, Sequence
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+try:  # Optional dependency
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - optional import
+    np = None  # type: ignore
 
 from ..vectorstore import VectorStore
 from .embeddings import embed_texts
 from ..memory import MemoryManager
 
 
+_TOKEN_RE = re.compile(r"\w+")
+TOKEN_CACHE_SIZE = 8192
+QUERY_CACHE_SIZE = 256  # per session
+QUERY_CACHE_TTL = 300.0  # seconds
+QUERY_CACHE_MIN_SIM = 0.95
+EMBED_BATCH_SIZE = 32
+EMBED_BATCH_DELAY = 0.005  # seconds a question waits for others to share its request
+QUESTION_VECTOR_CACHE_SIZE = 256
+
+# Question embeddings from concurrent callers are coalesced into one embed_texts call
+_EMBED_QUEUE: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+_EMBED_LOCK = threading.Lock()
+_embed_worker: Optional[threading.Thread] = None
+# Recent question -> vector, so retrieval and answer caching share one embedding per question
+_QUESTION_VECTORS: "OrderedDict[str, Sequence[float]]" = OrderedDict()
+
+
 def _tokenize(text: str) -> List[str]:
-    return re.findall(r"\b\w+\b", text.lower())
+    return _TOKEN_RE.findall(text.lower())
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _token_set(text: str) -> FrozenSet[str]:
+    """Distinct tokens of ``text``; chunk texts repeat across queries in a session."""
+    return frozenset(_tokenize(text))
+
+
+class KeywordIndex:
+    """Inverted token index so repeated keyword queries skip re-tokenizing chunks."""
+
+    def __init__(self, chunks: Iterable[Dict]) -> None:
+        self.chunks: List[Dict] = []
+        self.postings: Dict[str, List[int]] = {}
+        # Postings converted to int arrays on first use by a numpy query
+        self._arrays: Dict[str, "np.ndarray"] = {}
+        for idx, ch in enumerate(chunks):
+            self.chunks.append(ch)
+            for tok in _token_set(ch.get("text", "")):
+                self.postings.setdefault(tok, []).append(idx)
 
+    def query(self, question: str, top_n: int = 5) -> List[Dict]:
+        if np is not None:
+            return self._query_numpy(question, top_n)
+        # Score = number of distinct question tokens present; Counter tallies the postings in C
+        overlap = Counter(chain.from_iterable(self.postings.get(tok, ()) for tok in _token_set(question)))
+        # Bounded heap: O(N log k) instead of sorting every chunk with any overlap
+        ranked = heapq.nlargest(top_n, overlap.items(), key=lambda item: (item[1], -item[0]))
+        return [self.chunks[idx] for idx, _ in ranked]
 
-def keyword_retrieve(chunks: Sequence[Dict], question: str, top_n: int = 5) -> List[Dict]:
+    def _query_numpy(self, question: str, top_n: int) -> List[Dict]:
+        hit_lists = []
+        for tok in _token_set(question):
+            arr = self._arrays.get(tok)
+            if arr is None:
+                postings = self.postings.get(tok)
+                if not postings:
+                    continue
+                arr = self._arrays[tok] = np.asarray(postings, dtype=np.int64)
+            hit_lists.append(arr)
+        if not hit_lists or top_n <= 0:
+            return []
+        counts = np.bincount(np.concatenate(hit_lists), minlength=len(self.chunks))
+        hits = np.flatnonzero(counts)
+        if len(hits) > top_n:
+            # Keep everything tied with the k-th best count, then order stably so ties
+            # resolve to the earlier chunk like the Counter path
+            kth = np.partition(counts[hits], -top_n)[-top_n]
+            hits = hits[counts[hits] >= kth]
+        order = hits[np.argsort(-counts[hits], kind="stable")][:top_n]
+        return [self.chunks[idx] for idx in order.tolist()]
+
+
+def keyword_retrieve(chunks: Iterable[Dict], question: str, top_n: int = 5) -> List[Dict]:
     """Very simple keyword overlap scorer for MVP without extra deps."""
-    q_tok = set(_tokenize(question))
-    if not q_tok:
+    q_tokens = _token_set(question)
+    if not q_tokens:
         return []
-    scored = []
-    for ch in chunks:
-        text = ch.get("text", "")
-        t_tok = set(_tokenize(text))
-        overlap = len(q_tok & t_tok)
-        if overlap > 0:
-            scored.append((overlap, ch))
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [ch for _, ch in scored[:top_n]]
+    # Tokens come from text.lower(), so a chunk lacking every query token as a substring
+    # cannot overlap; skip indexing it. Relative order (the tie-break) is preserved.
+    candidates = [ch for ch in chunks if _mentions_any(ch.get("text", ""), q_tokens)]
+    return KeywordIndex(candidates).query(question, top_n=top_n)
+
+
+def _mentions_any(text: str, tokens: FrozenSet[str]) -> bool:
+    lowered = text.lower()
+    return any(tok in lowered for tok in tokens)
+
+
+class _CacheEntry:
+    __slots__ = ("embedding", "norm", "hits", "top_n", "created")
+
+    def __init__(self, embedding: Sequence[float], hits: List[Dict], top_n: int) -> None:
+        self.embedding = embedding
+        self.norm = math.hypot(*embedding)
+        self.hits = hits
+        self.top_n = top_n
+        self.created = time.monotonic()
+
+
+class QueryCache:
+    """Per-session LRU of vector_retrieve results keyed by question.
+
+    Exact repeats skip the embedding call; near-duplicates (cosine >= ``min_sim`` to a
+    cached question embedding) skip the vector scan. Entries expire after ``ttl`` seconds
+    and a session is dropped wholesale when the store's data version changes.
+    """
+
+    def __init__(self, capacity: int = QUERY_CACHE_SIZE, ttl: float = QUERY_CACHE_TTL, min_sim: float = QUERY_CACHE_MIN_SIM) -> None:
+        self.capacity = capacity
+        self.ttl = ttl
+        self.min_sim = min_sim
+        self._lock = threading.RLock()
+        self._sessions: Dict[Tuple[str, str], Tuple[object, "OrderedDict[str, _CacheEntry]"]] = {}
+
+    def _entries(self, key: Tuple[str, str], version: object) -> "OrderedDict[str, _CacheEntry]":
+        current = self._sessions.get(key)
+        if current is None or current[0] != version:
+            current = (version, OrderedDict())
+            self._sessions[key] = current
+        entries = current[1]
+        now = time.monotonic()
+        for question in [q for q, e in entries.items() if now - e.created > self.ttl]:
+            del entries[question]
+        return entries
+
+    def lookup(self, key: Tuple[str, str], version: object, question: str, top_n: int) -> Optional[List[Dict]]:
+        with self._lock:
+            entries = self._entries(key, version)
+            entry = entries.get(question)
+            if entry is None or entry.top_n < top_n:
+                return None
+            entries.move_to_end(question)
+            return entry.hits[:top_n]
+
+    def lookup_similar(self, key: Tuple[str, str], version: object, embedding: Sequence[float], top_n: int) -> Optional[List[Dict]]:
+        norm = math.hypot(*embedding)
+        if norm == 0:
+            return None
+        with self._lock:
+            entries = self._entries(key, version)
+            for question, entry in reversed(entries.items()):
+                if entry.top_n < top_n or entry.norm == 0 or len(entry.embedding) != len(embedding):
+                    continue
+                dot = sum(map(operator.mul, embedding, entry.embedding))
+                if dot / (norm * entry.norm) >= self.min_sim:
+                    entries.move_to_end(question)
+                    return entry.hits[:top_n]
+        return None
+
+    def store(self, key: Tuple[str, str], version: object, question: str, embedding: Sequence[float], hits: List[Dict], top_n: int) -> None:
+        with self._lock:
+            entries = self._entries(key, version)
+            entries[question] = _CacheEntry(embedding, hits, top_n)
+            entries.move_to_end(question)
+            while len(entries) > self.capacity:
+                entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+
+
+_QUERY_CACHE = QueryCache()
+
+
+def embed_question(question: str) -> Optional[Sequence[float]]:
+    """Embed one question, sharing the request with questions from other threads.
+
+    Returns None for blank input (embed_texts drops those).
+    """
+    global _embed_worker
+    if not isinstance(question, str) or not question.strip():
+        return None
+    with _EMBED_LOCK:
+        vector = _QUESTION_VECTORS.get(question)
+        if vector is not None:
+            _QUESTION_VECTORS.move_to_end(question)
+            return vector
+        if _embed_worker is None:
+            _embed_worker = threading.Thread(target=_drain_questions, name="question-embedder", daemon=True)
+            _embed_worker.start()
+    future: Future = Future()
+    _EMBED_QUEUE.put((question, future))
+    vector = future.result()
+    if vector is not None:
+        with _EMBED_LOCK:
+            _QUESTION_VECTORS[question] = vector
+            while len(_QUESTION_VECTORS) > QUESTION_VECTOR_CACHE_SIZE:
+                _QUESTION_VECTORS.popitem(last=False)
+    return vector
+
+
+def embed_questions(questions: Sequence[str]) -> None:
+    """Embed every uncached question in one embed_texts call, warming embed_question's cache.
+
+    Lets a caller about to ask several questions pay for a single request.
+    """
+    with _EMBED_LOCK:
+        pending = list(dict.fromkeys(q for q in questions if isinstance(q, str) and q.strip() and q not in _QUESTION_VECTORS))
+    if not pending:
+        return
+    vectors = embed_texts(pending)
+    with _EMBED_LOCK:
+        for question, vector in zip(pending, vectors):
+            _QUESTION_VECTORS[question] = vector
+            _QUESTION_VECTORS.move_to_end(question)
+        while len(_QUESTION_VECTORS) > QUESTION_VECTOR_CACHE_SIZE:
+            _QUESTION_VECTORS.popitem(last=False)
+
+
+def _drain_questions() -> None:
+    while True:
+        batch = [_EMBED_QUEUE.get()]
+        deadline = time.monotonic() + EMBED_BATCH_DELAY
+        while len(batch) < EMBED_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_EMBED_QUEUE.get(timeout=remaining))
+            except queue.Empty:
+                break
+        texts = list(dict.fromkeys(question for question, _ in batch))
+        try:
+            vectors = dict(zip(texts, embed_texts(texts)))
+        except Exception as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            continue
+        for question, future in batch:
+            future.set_result(vectors.get(question))
 
 
 def vector_retrieve(session_id: str, question: str, store: VectorStore, top_n: int = 5) -> List[Dict]:
-    embeddings = embed_texts([question])
-    if not embeddings:
+    key = (str(store.path), session_id)
+    version = store.data_version()
+    cached = _QUERY_CACHE.lookup(key, version, question, top_n)
+    if cached is not None:
+        return cached
+    embedding = embed_question(question)
+    if not embedding:
         return []
-    result = store.query(session_id, embeddings[0], top_k=top_n)
+    cached = _QUERY_CACHE.lookup_similar(key, version, embedding, top_n)
+    if cached is not None:
+        return cached
+    result = store.query(session_id, embedding, top_k=top_n)
+    _QUERY_CACHE.store(key, version, question, embedding, list(result), top_n)
     return result
 
 
@@ -47,31 +284,16 @@ def multimodal_retrieve(
     """Retrieve relevant text, figures, and tables plus memory context."""
     if content_types is None:
         content_types = ["text", "figure", "table"]
-    embeddings = embed_texts([question])
-    if not embeddings:
+    embedding = embed_question(question)
+    if not embedding:
         return {"text_chunks": [], "figures": [], "tables": [], "memory_context": []}
-    hits = store.query(session_id, embeddings[0], top_k=max(top_n * 4, top_n))
-    # Partition by type
-    texts: List[Dict] = []
-    figures: List[Dict] = []
-    tables: List[Dict] = []
-    for h in hits:
-        ctype = (h.get("content_type") or "text").lower()
-        if ctype == "figure" and "figure" in content_types:
-            figures.append(h)
-        elif ctype == "table" and "table" in content_types:
-            tables.append(h)
-        elif "text" in content_types:
-            texts.append(h)
-        # Stop early if enough collected
-        if len(texts) >= top_n and len(figures) >= top_n and len(tables) >= top_n:
-            break
+    buckets = store.query_by_type(session_id, embedding, top_n, content_types)
     mem = memory_manager.get_relevant_context(session_id, question)
     mem_items = [{"level": "session", "text": mem}] if mem else []
     return {
-        "text_chunks": texts[:top_n],
-        "figures": figures[:top_n],
-        "tables": tables[:top_n],
+        "text_chunks": buckets.get("text", []),
+        "figures": buckets.get("figure", []),
+        "tables": buckets.get("table", []),
         "memory_context": mem_items,
     }
 
@@ -1,18 +1,23 @@
 from __future__ import annotations
 
 import datetime as dt
+import io
 import re
 import urllib.parse
-import urllib.request
 import xml.etree.ElementTree as ET
 from typing import Dict, List
 
+from .http_cache import cached_get
+
 
 ARXIV_API = "http://export.arxiv.org/api/query"
+_WS_RE = re.compile(r"\s+")
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_ENTRY = f"{_ATOM}entry"
 
 
 def _norm_title(title: str) -> str:
-    return re.sub(r"\s+", " ", title).strip().lower()
+    return _WS_RE.sub(" ", title).strip().lower()
 
 
 def search_arxiv(query: str, max_results: int = 20, start: int = 0, sort: str = "submittedDate", order: str = "descending") -> List[Dict]:
@@ -28,47 +33,52 @@ def search_arxiv(query: str, max_results: int = 20, start: int = 0, sort: str =
         "sortOrder": order,
     })
     url = f"{ARXIV_API}?{q}"
-    req = urllib.request.Request(url, headers={"User-Agent": "paper-sailor/0.1"})
-    with urllib.request.urlopen(req, timeout=20) as resp:
-        data = resp.read()
+    resp = cached_get(url, headers={"User-Agent": "paper-sailor/0.1"}, timeout=20)
+    if resp.status >= 400:
+        raise RuntimeError(f"arXiv search failed: {resp.status} {resp.reason}")
+    data = resp.body
 
-    root = ET.fromstring(data)
-    ns = {"a": "http://www.w3.org/2005/Atom"}
     out: List[Dict] = []
-    for entry in root.findall("a:entry", ns):
-        id_text = entry.findtext("a:id", default="", namespaces=ns)
-        title = (entry.findtext("a:title", default="", namespaces=ns) or "").strip()
-        summary = (entry.findtext("a:summary", default="", namespaces=ns) or "").strip()
-        published = entry.findtext("a:published", default="", namespaces=ns) or ""
-        year = None
-        if published:
-            try:
-                year = dt.datetime.fromisoformat(published.replace("Z", "+00:00")).year
-            except Exception:
-                year = None
-        authors: List[str] = [a.findtext("a:name", default="", namespaces=ns) or "" for a in entry.findall("a:author", ns)]
+    # Entries are handled as they close and then cleared, so only one is held at a time
+    for _, elem in ET.iterparse(io.BytesIO(data), events=("end",)):
+        if elem.tag == _ENTRY:
+            out.append(_parse_entry(elem))
+            elem.clear()
+    return out
 
-        url_html = None
-        pdf_url = None
-        for link in entry.findall("a:link", ns):
-            rel = link.attrib.get("rel")
-            href = link.attrib.get("href")
-            link_type = link.attrib.get("type")
-            if rel == "alternate" and href:
-                url_html = href
-            if link_type == "application/pdf" and href:
-                pdf_url = href
 
-        arxiv_id = id_text.split("/abs/")[-1] if "/abs/" in id_text else id_text.rsplit("/", 1)[-1]
-        out.append({
-            "id": f"arxiv:{arxiv_id}",
-            "source": "arxiv",
-            "title": re.sub(r"\s+", " ", title),
-            "authors": authors,
-            "year": year,
-            "url": url_html or f"https://arxiv.org/abs/{arxiv_id}",
-            "pdf_url": pdf_url or f"https://arxiv.org/pdf/{arxiv_id}.pdf",
-            "summary": summary,
-        })
-    return out
+def _parse_entry(entry: ET.Element) -> Dict:
+    id_text = entry.findtext(f"{_ATOM}id", default="")
+    title = (entry.findtext(f"{_ATOM}title", default="") or "").strip()
+    summary = (entry.findtext(f"{_ATOM}summary", default="") or "").strip()
+    published = entry.findtext(f"{_ATOM}published", default="") or ""
+    year = None
+    if published:
+        try:
+            year = dt.datetime.fromisoformat(published.replace("Z", "+00:00")).year
+        except Exception:
+            year = None
+    authors: List[str] = [a.findtext(f"{_ATOM}name", default="") or "" for a in entry.iterfind(f"{_ATOM}author")]
+
+    url_html = None
+    pdf_url = None
+    for link in entry.iterfind(f"{_ATOM}link"):
+        rel = link.attrib.get("rel")
+        href = link.attrib.get("href")
+        link_type = link.attrib.get("type")
+        if rel == "alternate" and href:
+            url_html = href
+        if link_type == "application/pdf" and href:
+            pdf_url = href
 
+    arxiv_id = id_text.split("/abs/")[-1] if "/abs/" in id_text else id_text.rsplit("/", 1)[-1]
+    return {
+        "id": f"arxiv:{arxiv_id}",
+        "source": "arxiv",
+        "title": _WS_RE.sub(" ", title),
+        "authors": authors,
+        "year": year,
+        "url": url_html or f"https://arxiv.org/abs/{arxiv_id}",
+        "pdf_url": pdf_url or f"https://arxiv.org/pdf/{arxiv_id}.pdf",
+        "summary": summary,
+    }
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-import json
 import urllib.parse
-import urllib.request
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional
+
+from .. import _jsonio
+from .http_cache import cached_get
 
 
 OPENALEX_WORKS_API = "https://api.openalex.org/works"
@@ -13,26 +14,20 @@ _USER_AGENT = "paper-sailor/0.1"
 def _reconstruct_abstract(data: Optional[Dict[str, List[int]]]) -> str:
     if not data or not isinstance(data, dict):
         return ""
-    max_index = -1
-    positions: List[Tuple[int, str]] = []
+    # position -> word; later words win on duplicate positions, as in the inverted index order
+    slots: Dict[int, str] = {}
     for word, idx_list in data.items():
         if not isinstance(idx_list, list):
             continue
         for idx in idx_list:
-            try:
-                pos = int(idx)
-            except (TypeError, ValueError):
-                continue
-            max_index = max(max_index, pos)
-            positions.append((pos, word))
-    if max_index < 0:
-        return ""
-    slots = [""] * (max_index + 1)
-    for pos, word in positions:
-        if 0 <= pos < len(slots):
-            slots[pos] = word
-    words = [w for w in slots if w]
-    return " ".join(words)
+            if type(idx) is not int:
+                try:
+                    idx = int(idx)
+                except (TypeError, ValueError):
+                    continue
+            if idx >= 0:
+                slots[idx] = word
+    return " ".join(word for _, word in sorted(slots.items()) if word)
 
 
 def _normalize_id(oa_id: str) -> str:
@@ -58,14 +53,15 @@ def search_openalex(
     if mailto:
         params["mailto"] = mailto
     url = f"{OPENALEX_WORKS_API}?{urllib.parse.urlencode(params)}"
-    req = urllib.request.Request(url, headers={"User-Agent": _USER_AGENT})
     try:
-        with urllib.request.urlopen(req, timeout=20) as resp:
-            payload = resp.read()
+        resp = cached_get(url, headers={"User-Agent": _USER_AGENT}, timeout=20)
     except Exception:
         return []
+    if resp.status >= 400:
+        return []
+    payload = resp.body
     try:
-        data = json.loads(payload.decode("utf-8"))
+        data = _jsonio.loads(payload)
     except Exception:
         return []
     results = data.get("results") if isinstance(data, dict) else None
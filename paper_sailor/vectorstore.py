@@ -1,22 +1,75 @@
 from __future__ import annotations
 
-import json
+import heapq
 import math
+import operator
 import sqlite3
+import struct
+import threading
+from array import array
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
+from . import _jsonio
+from .config import get_retrieval_settings
 from .storage import ensure_dirs, vector_store_path
 
+try:  # Optional dependency
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - optional import
+    np = None  # type: ignore
+
+try:  # Optional dependency
+    import hnswlib  # type: ignore
+except Exception:  # pragma: no cover - optional import
+    hnswlib = None  # type: ignore
+
+# Sessions larger than this are searched through an HNSW index when hnswlib is installed
+ANN_THRESHOLD = 5000
+# Bound on IN (...) placeholders per statement; older SQLite builds cap variables at 999
+HYDRATE_BATCH = 500
+
+
+# Applied once per connection; WAL lets readers proceed while an upsert commits
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+
 
 class VectorStore:
-    def __init__(self, path: Optional[Path] = None) -> None:
+    def __init__(self, path: Optional[Path] = None, *, high_precision: Optional[bool] = None) -> None:
         ensure_dirs()
         self.path = Path(path or vector_store_path())
+        # Score from the float16 column instead of the int8 codes (retrieval.high_precision)
+        if high_precision is None:
+            high_precision = get_retrieval_settings().high_precision
+        self.high_precision = high_precision
+        # session_id -> (db file stamp, chunk ids, vectors, norms); see _session_vectors
+        self._vectors: Dict[str, Tuple[Tuple[int, ...], List[str], Any, Any]] = {}
+        # session_id -> (db file stamp, chunk_id -> "text" | "figure" | "table")
+        self._types: Dict[str, Tuple[Tuple[int, ...], Dict[str, str]]] = {}
+        self._local = threading.local()
+        # session_id -> (matrix the index was last synced to, its chunk ids, HnswBackend)
+        self._ann: Dict[str, Tuple[Any, List[str], "HnswBackend"]] = {}
         self._ensure_schema()
 
     def _connect(self) -> sqlite3.Connection:
-        return sqlite3.connect(self.path)
+        """This thread's connection, opened and configured on first use.
+
+        Callers use it as ``with self._connect() as conn:`` which wraps a transaction
+        but leaves the connection open for reuse.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            for pragma in SQLITE_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+        return conn
 
     def _ensure_schema(self) -> None:
         with self._connect() as conn:
@@ -27,7 +80,7 @@ class VectorStore:
                     chunk_id TEXT PRIMARY KEY,
                     paper_id TEXT,
                     text TEXT,
-                    embedding TEXT,
+                    embedding BLOB,
                     metadata TEXT
                 )
                 """
@@ -48,132 +101,455 @@ class VectorStore:
                 conn.execute("ALTER TABLE embeddings ADD COLUMN image_path TEXT")
             except Exception:
                 pass
+            for column in ("norm REAL", "embedding_i8 BLOB", "scale REAL"):
+                try:
+                    conn.execute(f"ALTER TABLE embeddings ADD COLUMN {column}")
+                except Exception:
+                    pass
+            _backfill_embeddings(conn)
 
     def upsert(self, session_id: str, records: Iterable[Dict]) -> None:
+        records = [rec for rec in records if rec.get("embedding") and rec.get("chunk_id")]
+        encoded = _encode_batch([rec["embedding"] for rec in records])
         rows = []
-        for rec in records:
-            emb = rec.get("embedding")
-            chunk_id = rec.get("chunk_id")
-            if not emb or not chunk_id:
-                continue
+        for rec, (blob, norm, quantized, scale) in zip(records, encoded):
             rows.append(
                 (
                     session_id,
-                    chunk_id,
+                    rec["chunk_id"],
                     rec.get("paper_id"),
                     rec.get("text"),
-                    json.dumps(list(map(float, emb))),
-                    json.dumps(rec.get("metadata", {})),
+                    blob,
+                    _jsonio.dumps(rec.get("metadata", {})).decode("utf-8"),
+                    norm,
+                    quantized,
+                    scale,
                 )
             )
         if not rows:
             return
+        self._vectors.pop(session_id, None)
+        self._types.pop(session_id, None)
         with self._connect() as conn:
             conn.executemany(
-                "REPLACE INTO embeddings (session_id, chunk_id, paper_id, text, embedding, metadata) VALUES (?, ?, ?, ?, ?, ?)",
+                "REPLACE INTO embeddings (session_id, chunk_id, paper_id, text, embedding, metadata, norm, embedding_i8, scale) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
                 rows,
             )
 
     def upsert_multimodal(self, session_id: str, records: Iterable[Dict]) -> None:
         """Insert/update records with optional multimodal fields."""
+        records = [rec for rec in records if rec.get("embedding") and rec.get("chunk_id")]
+        encoded = _encode_batch([rec["embedding"] for rec in records])
         rows = []
-        for rec in records:
-            emb = rec.get("embedding")
-            chunk_id = rec.get("chunk_id")
-            if not emb or not chunk_id:
-                continue
+        for rec, (blob, norm, quantized, scale) in zip(records, encoded):
             rows.append(
                 (
                     session_id,
-                    chunk_id,
+                    rec["chunk_id"],
                     rec.get("paper_id"),
                     rec.get("text"),
-                    json.dumps(list(map(float, emb))),
-                    json.dumps(rec.get("metadata", {})),
+                    blob,
+                    _jsonio.dumps(rec.get("metadata", {})).decode("utf-8"),
                     rec.get("content_type") or "text",
                     rec.get("visual_description"),
                     rec.get("image_path"),
+                    norm,
+                    quantized,
+                    scale,
                 )
             )
         if not rows:
             return
+        self._vectors.pop(session_id, None)
+        self._types.pop(session_id, None)
         with self._connect() as conn:
             conn.executemany(
-                "REPLACE INTO embeddings (session_id, chunk_id, paper_id, text, embedding, metadata, content_type, visual_description, image_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                "REPLACE INTO embeddings (session_id, chunk_id, paper_id, text, embedding, metadata, content_type, visual_description, image_path, norm, embedding_i8, scale) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
                 rows,
             )
 
     def delete_session(self, session_id: str) -> None:
+        self._vectors.pop(session_id, None)
+        self._types.pop(session_id, None)
+        self._ann.pop(session_id, None)
         with self._connect() as conn:
             conn.execute("DELETE FROM embeddings WHERE session_id = ?", (session_id,))
 
     def query(self, session_id: str, embedding: List[float], top_k: int = 5) -> List[Dict]:
-        if not embedding:
-            return []
-        with self._connect() as conn:
-            try:
-                rows = conn.execute(
-                    "SELECT chunk_id, paper_id, text, embedding, metadata, content_type, visual_description, image_path FROM embeddings WHERE session_id = ?",
-                    (session_id,),
-                ).fetchall()
-                has_extra = True
-            except Exception:
-                rows = conn.execute(
-                    "SELECT chunk_id, paper_id, text, embedding, metadata FROM embeddings WHERE session_id = ?",
-                    (session_id,),
-                ).fetchall()
-                has_extra = False
+        return self._hydrate(self.score(session_id, embedding, top_k))
 
+    def query_by_type(
+        self, session_id: str, embedding: List[float], top_k: int, content_types: Sequence[str]
+    ) -> Dict[str, List[Dict]]:
+        """Best ``top_k`` hits for each of the requested content types from one scoring pass.
+
+        Types are "text", "figure" and "table"; rows of any other type count as text. Only
+        the picked rows are hydrated, and a session holding a single type is scored with a
+        plain ``top_k`` query instead of ranking every row.
+        """
+        wanted = [t for t in ("text", "figure", "table") if t in content_types]
+        types = self._session_types(session_id)
+        quota = {t: 0 for t in wanted}
+        for ctype in types.values():
+            if ctype in quota:
+                quota[ctype] += 1
+        quota = {t: min(n, top_k) for t, n in quota.items()}
+        remaining = sum(quota.values())
+        picked: Dict[str, List[Tuple[str, float]]] = {t: [] for t in wanted}
+        if remaining:
+            candidates = top_k if len(set(types.values())) == 1 else len(types)
+            for chunk_id, score in self.score(session_id, embedding, top_k=candidates):
+                ctype = types.get(chunk_id)
+                if ctype in quota and len(picked[ctype]) < quota[ctype]:
+                    picked[ctype].append((chunk_id, score))
+                    remaining -= 1
+                    if not remaining:
+                        break
+        return {t: self._hydrate(top) for t, top in picked.items()}
+
+    def score(self, session_id: str, embedding: Sequence[float], top_k: int = 5) -> List[Tuple[str, float]]:
+        """Best ``top_k`` (chunk_id, cosine) pairs; reads only vectors, never text or metadata."""
+        if not embedding or top_k <= 0:
+            return []
         query_norm = _vector_norm(embedding)
         if query_norm == 0:
             return []
 
-        scored: List[Dict] = []
-        for row in rows:
-            if len(row) >= 8:
-                chunk_id, paper_id, text, emb_json, meta_json, content_type, visual_desc, image_path = row[:8]
-            else:
-                chunk_id, paper_id, text, emb_json, meta_json = row[:5]
-                content_type, visual_desc, image_path = "text", None, None
-            try:
-                emb = json.loads(emb_json)
-            except Exception:
+        ids, matrix, norms = self._session_vectors(session_id)
+        if not ids:
+            return []
+        if not isinstance(matrix, list):
+            # A query from a different embedding model than the stored rows takes the exact
+            # path, which scores the mismatch as -1 instead of raising
+            if (
+                hnswlib is not None
+                and len(ids) > ANN_THRESHOLD
+                and top_k < len(ids)
+                and matrix.shape[1] == len(embedding)
+            ):
+                return self._ann_index(session_id, ids, matrix, norms).search(embedding, top_k, ids)
+            return _top_k_numpy(embedding, query_norm, ids, matrix, norms, top_k)
+        scores = [_cosine_similarity(embedding, vec, query_norm, norm) for vec, norm in zip(matrix, norms)]
+        best = heapq.nlargest(top_k, range(len(ids)), key=scores.__getitem__)
+        return [(ids[i], scores[i]) for i in best]
+
+    def _ann_index(self, session_id: str, ids: List[str], matrix, norms) -> "HnswBackend":
+        """HNSW index over the session matrix, kept in step as the matrix is reloaded.
+
+        Rows are read in insertion order, so when the previous ids and vectors are an
+        unchanged prefix of the new matrix only the appended rows are inserted. Any other
+        change rebuilds the index, including a re-upserted chunk that kept its position
+        but not its vector (REPLACE of the newest rows, or a write from another store).
+        """
+        cached = self._ann.get(session_id)
+        if cached is not None and cached[0] is matrix:
+            return cached[2]
+        start = 0
+        backend = None
+        if cached is not None:
+            old_matrix, old_ids, old_backend = cached
+            if (
+                old_backend.dim == matrix.shape[1]
+                and ids[: len(old_ids)] == old_ids
+                and np.array_equal(matrix[: len(old_ids)], old_matrix)
+            ):
+                backend, start = old_backend, len(old_ids)
+        if backend is None:
+            backend = HnswBackend(matrix.shape[1])
+        labels = start + np.flatnonzero(norms[start:] > 0)
+        backend.add(labels, matrix[labels])
+        self._ann[session_id] = (matrix, list(ids), backend)
+        return backend
+
+    def data_version(self) -> Tuple[int, ...]:
+        """Opaque stamp that changes whenever the database file is written."""
+        return _file_stamp(self.path)
+
+    def _session_vectors(self, session_id: str) -> Tuple[List[str], Any, Any]:
+        """Vectors and norms for a session, cached until the database file changes.
+
+        With numpy the vectors come back as one float32 (N, d) matrix of unit rows (zero rows
+        where the norm is 0), built from the int8 columns when every row has them (and
+        high_precision is off), else from the float16 column; without numpy, or when
+        dimensions are mixed, as a list of raw float lists.
+        """
+        stamp = _file_stamp(self.path)
+        cached = self._vectors.get(session_id)
+        if cached is not None and cached[0] == stamp:
+            return cached[1:]
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT chunk_id, embedding, norm, embedding_i8, scale FROM embeddings WHERE session_id = ?",
+                (session_id,),
+            ).fetchall()
+        entry = _quantized_matrix(rows) if np is not None and not self.high_precision else None
+        if entry is None:
+            entry = _float_vectors(rows)
+        self._vectors[session_id] = (stamp, *entry)
+        return entry
+
+    def _session_types(self, session_id: str) -> Dict[str, str]:
+        """chunk_id -> content type bucket for a session, cached until the database file changes."""
+        stamp = _file_stamp(self.path)
+        cached = self._types.get(session_id)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT chunk_id, content_type FROM embeddings WHERE session_id = ?",
+                (session_id,),
+            ).fetchall()
+        types = {}
+        for chunk_id, ctype in rows:
+            ctype = (ctype or "text").lower()
+            types[chunk_id] = ctype if ctype in ("figure", "table") else "text"
+        self._types[session_id] = (stamp, types)
+        return types
+
+    def _hydrate(self, top: List[Tuple[str, float]]) -> List[Dict]:
+        """Load text/metadata for the scored (chunk_id, score) pairs, preserving order."""
+        if not top:
+            return []
+        chunk_ids = [chunk_id for chunk_id, _ in top]
+        by_id = {}
+        with self._connect() as conn:
+            for start in range(0, len(chunk_ids), HYDRATE_BATCH):
+                batch = chunk_ids[start : start + HYDRATE_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT chunk_id, paper_id, text, metadata, content_type, visual_description, image_path FROM embeddings WHERE chunk_id IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                by_id.update((row[0], row) for row in rows)
+        results: List[Dict] = []
+        for chunk_id, score in top:
+            row = by_id.get(chunk_id)
+            if row is None:
                 continue
-            score = _cosine_similarity(embedding, emb, query_norm)
+            _, paper_id, text, meta_json, content_type, visual_desc, image_path = row
             metadata = {}
             if meta_json:
                 try:
-                    metadata = json.loads(meta_json)
+                    metadata = _jsonio.loads(meta_json)
                 except Exception:
                     metadata = {}
-            scored.append(
+            results.append(
                 {
                     "chunk_id": chunk_id,
                     "paper_id": paper_id,
                     "text": text,
                     "score": score,
                     "metadata": metadata,
-                    "content_type": content_type,
+                    "content_type": content_type or "text",
                     "visual_description": visual_desc,
                     "image_path": image_path,
                 }
             )
+        return results
+
+
+class HnswBackend:
+    """Approximate cosine top-k over one session's vectors (requires hnswlib and numpy).
+
+    Labels are row positions in the session matrix; callers map them back to chunk ids.
+    Cosine space normalizes vectors itself, so rows need no rescaling before ``add``.
+    """
+
+    def __init__(self, dim: int, *, ef_construction: int = 200, m: int = 16, ef: int = 64) -> None:
+        self.dim = dim
+        self.ef = ef
+        self.ef_construction = ef_construction
+        self.m = m
+        self.count = 0
+        self._index = None
+
+    def add(self, labels, vectors) -> None:
+        count = len(labels)
+        if count == 0:
+            return
+        if self._index is None:
+            self._index = hnswlib.Index(space="cosine", dim=self.dim)
+            self._index.init_index(max_elements=count, ef_construction=self.ef_construction, M=self.m)
+        else:
+            self._index.resize_index(self.count + count)
+        self._index.add_items(np.asarray(vectors, dtype=np.float32), np.asarray(labels))
+        self.count += count
+
+    def search(self, query: Sequence[float], top_k: int, ids: List[str]) -> List[Tuple[str, float]]:
+        k = min(top_k, self.count)
+        if k <= 0 or self._index is None:
+            return []
+        self._index.set_ef(max(self.ef, k))
+        labels, distances = self._index.knn_query(np.asarray(query, dtype=np.float32), k=k)
+        return [(ids[label], 1.0 - float(dist)) for label, dist in zip(labels[0].tolist(), distances[0].tolist())]
+
+
+def _encode_embedding(emb: Iterable[float]) -> Tuple[bytes, float]:
+    """Pack a vector as little-endian float16 and return it with its L2 norm.
+
+    The norm is taken from the stored (half-precision) values so query-time scoring
+    against the persisted norm matches what a fresh computation would give.
+    """
+    values = [float(x) for x in emb]
+    raw = struct.pack(f"<{len(values)}e", *values)
+    return raw, _vector_norm(struct.unpack(f"<{len(values)}e", raw))
+
+
+def _encode_batch(embeddings: List[Sequence[float]]) -> List[Tuple[bytes, float, bytes, float]]:
+    """(float16 blob, norm, int8 blob, scale) per vector, as _encode_embedding/_quantize give.
+
+    With numpy and a uniform dimension the whole batch is packed as one matrix.
+    """
+    if np is None or not embeddings or len({len(e) for e in embeddings}) != 1:
+        return [(*_encode_embedding(e), *_quantize(e)) for e in embeddings]
+    values = np.asarray(embeddings, dtype=np.float64)
+    halves = values.astype("<f2")
+    norms = np.sqrt(np.square(halves.astype(np.float64)).sum(axis=1))
+    peaks = np.abs(values).max(axis=1)
+    scales = peaks / 127.0
+    codes = np.rint(np.divide(values, scales[:, None], out=np.zeros_like(values), where=scales[:, None] > 0))
+    codes = codes.astype(np.int8)
+    return [
+        (halves[i].tobytes(), float(norms[i]), codes[i].tobytes(), float(scales[i]))
+        for i in range(len(embeddings))
+    ]
+
+
+def _decode_embedding(raw) -> List[float]:
+    if isinstance(raw, str):  # rows written before the binary encoding
+        return _jsonio.loads(raw)
+    return list(struct.unpack(f"<{len(raw) // 2}e", raw))
+
 
-        scored.sort(key=lambda x: x["score"], reverse=True)
-        return scored[:top_k]
+def _quantize(emb: Iterable[float]) -> Tuple[bytes, float]:
+    """Symmetric max-abs int8 quantization; returns (int8 bytes, scale)."""
+    values = [float(x) for x in emb]
+    peak = max(map(abs, values), default=0.0)
+    if peak == 0:
+        return bytes(len(values)), 0.0
+    scale = peak / 127.0
+    return array("b", [round(v / scale) for v in values]).tobytes(), scale
 
 
-def _cosine_similarity(query: List[float], item: List[float], query_norm: Optional[float] = None) -> float:
+def _backfill_embeddings(conn: sqlite3.Connection) -> None:
+    """Bring rows written by older versions up to the current layout (one-shot).
+
+    Legacy JSON-text vectors are re-packed as binary, and any row missing its stored
+    norm or int8 copy gets them, so queries never recompute norms. The partial index
+    keeps this a no-op lookup once every row is current.
+    """
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_embeddings_stale ON embeddings(chunk_id) "
+        "WHERE norm IS NULL OR embedding_i8 IS NULL"
+    )
+    rows = conn.execute(
+        "SELECT chunk_id, embedding FROM embeddings WHERE norm IS NULL OR embedding_i8 IS NULL"
+    ).fetchall()
+    updates = []
+    for chunk_id, raw in rows:
+        try:
+            values = _decode_embedding(raw)
+            blob, norm = _encode_embedding(values)
+        except Exception:
+            continue
+        updates.append((blob, norm, *_quantize(values), chunk_id))
+    if updates:
+        conn.executemany(
+            "UPDATE embeddings SET embedding = ?, norm = ?, embedding_i8 = ?, scale = ? WHERE chunk_id = ?",
+            updates,
+        )
+
+
+def _file_stamp(path: Path) -> Tuple[int, ...]:
+    """mtime/size of the database and its WAL; commits land in the WAL until checkpoint."""
+    stamp: List[int] = []
+    for candidate in (path, path.with_name(path.name + "-wal")):
+        try:
+            st = candidate.stat()
+        except OSError:
+            stamp.extend((0, 0))
+        else:
+            stamp.extend((st.st_mtime_ns, st.st_size))
+    return tuple(stamp)
+
+
+def _float_vectors(rows) -> Tuple[List[str], Any, Any]:
+    ids: List[str] = []
+    vectors: List[List[float]] = []
+    norms: List[float] = []
+    for chunk_id, raw, norm, _, _ in rows:
+        try:
+            vec = _decode_embedding(raw)
+        except Exception:
+            continue
+        ids.append(chunk_id)
+        vectors.append(vec)
+        norms.append(norm if norm is not None else _vector_norm(vec))
+    if np is not None and vectors and len({len(v) for v in vectors}) == 1:
+        norm_arr = np.asarray(norms, dtype=np.float32)
+        return ids, _unit_rows(np.asarray(vectors, dtype=np.float32), norm_arr), norm_arr
+    return ids, vectors, norms
+
+
+def _unit_rows(matrix, norms, scales=None):
+    """Scale each row by ``scales / norms`` so cosine becomes a plain float32 gemv; zero-norm rows become 0."""
+    factors = np.ones_like(norms) if scales is None else scales.astype(np.float32)
+    factors = np.divide(factors, norms, out=np.zeros_like(norms), where=norms > 0)
+    return matrix.astype(np.float32) * factors[:, None]
+
+
+def _quantized_matrix(rows) -> Optional[Tuple[List[str], Any, Any]]:
+    """Unit rows dequantized straight from the int8 BLOBs; None if any row predates quantization."""
+    if not rows or any(r[3] is None or r[4] is None or r[2] is None for r in rows):
+        return None
+    dim = len(rows[0][3])
+    if dim == 0 or any(len(r[3]) != dim for r in rows):
+        return None
+    matrix = np.frombuffer(b"".join(bytes(r[3]) for r in rows), dtype=np.int8).reshape(len(rows), dim)
+    norms = np.fromiter((r[2] for r in rows), dtype=np.float32, count=len(rows))
+    scales = np.fromiter((r[4] for r in rows), dtype=np.float32, count=len(rows))
+    return [r[0] for r in rows], _unit_rows(matrix, norms, scales), norms
+
+
+def _top_k_numpy(
+    query: Sequence[float], query_norm: float, ids: List[str], matrix, norms, top_k: int
+) -> List[Tuple[str, float]]:
+    """Score every unit row with one float32 matrix-vector product and keep the best ``top_k``."""
+    sims = np.full(len(ids), -1.0, dtype=np.float32)
+    if matrix.shape[1] == len(query):
+        valid = norms > 0
+        dots = matrix @ (np.asarray(query, dtype=np.float32) / np.float32(query_norm))
+        sims[valid] = dots[valid]
+    k = min(top_k, len(ids))
+    idx = np.argpartition(-sims, k - 1)[:k]
+    idx = idx[np.argsort(-sims[idx], kind="stable")]
+    return [(ids[i], float(sims[i])) for i in idx.tolist()]
+
+
+def _cosine_similarity(
+    query: Sequence[float],
+    item: Sequence[float],
+    query_norm: Optional[float] = None,
+    item_norm: Optional[float] = None,
+) -> float:
     if not item or len(query) != len(item):
         return -1.0
     if query_norm is None:
         query_norm = _vector_norm(query)
-    item_norm = _vector_norm(item)
+    if item_norm is None:
+        item_norm = _vector_norm(item)
     if query_norm == 0 or item_norm == 0:
         return -1.0
-    dot = sum(q * v for q, v in zip(query, item))
-    return dot / (query_norm * item_norm)
+    return _dot(query, item) / (query_norm * item_norm)
+
+
+def _sum_of_products(a: Sequence[float], b: Sequence[float]) -> float:
+    return sum(map(operator.mul, a, b))
+
+
+# Picked once at import: math.sumprod (3.12+) runs the whole dot product in C
+_dot = getattr(math, "sumprod", _sum_of_products)
 
 
-def _vector_norm(vec: List[float]) -> float:
-    return math.sqrt(sum(x * x for x in vec))
+def _vector_norm(vec: Sequence[float]) -> float:
+    return math.hypot(*vec)
@@ -1,37 +1,74 @@
 from __future__ import annotations
 
-import re
+import hashlib
+import math
+import operator
+import threading
 import time
-from typing import Any, Dict, List, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+from .llm import call_llm
 from .planner import Planner
 from .storage import (
+    append_session_history,
+    chunks_path,
     ensure_dirs,
     json_write,
-    jsonl_append,
+    jsonl_append_many,
+    jsonl_read,
+    jsonl_write,
     load_json_default,
+    load_session_history,
     papers_jsonl,
     pdf_path,
     save_session_state,
+    session_history_path,
     session_path,
     session_state_path,
     write_chunks,
 )
 from .tools import (
+    discover_pdf_url,
     download_file,
     embed_texts,
     fetch_html,
-    keyword_retrieve,
+    KeywordIndex,
     parse_pdf_text,
     search_arxiv,
     vector_retrieve,
     multimodal_retrieve,
     extract_figures_and_tables,
 )
+from .tools.retrieval import embed_question, embed_questions
 from .vectorstore import VectorStore
 from .memory import MemoryManager
 
 
+SEARCH_CONCURRENCY = 4
+SEARCH_CACHE_MAX_AGE = 3600  # seconds a session replays a repeated query's results
+# Chunk fields left out of state["chunks"]; the full chunks live in the per-paper chunk files
+_CHUNK_TEXT_FIELDS = frozenset({"text", "visual_description"})
+MAX_HISTORY_IN_NOTE = 32
+EXCERPT_CHARS = 1200
+NEAR_DUP_MAX_DISTANCE = 6  # simhash bits two excerpts of one paper may differ by and still count as duplicates
+CHECKPOINT_EVERY = 3  # rounds between full state checkpoints; history is appended every round
+MAX_DOWNLOAD_WORKERS = 6
+ANSWER_CACHE_SIZE = 512
+ANSWER_CACHE_TTL = 900.0  # seconds
+ANSWER_CACHE_MIN_SIM = 0.95
+KEYWORD_INDEX_CACHE_SIZE = 4  # sessions whose keyword index (and chunk texts) stay in memory
+
+# (session_id, sorted evidence chunk ids) -> [(question, embedding or None, answer, created)]
+_ANSWER_CACHE: "OrderedDict[Tuple[str, Tuple[str, ...]], List[Tuple[str, Optional[Sequence[float]], str, float]]]" = OrderedDict()
+_ANSWER_LOCK = threading.RLock()
+# session_id -> (chunk count, index) for the keyword fallback, least recently used first;
+# dropped when a read updates chunks
+_KEYWORD_INDEXES: "OrderedDict[str, Tuple[int, KeywordIndex]]" = OrderedDict()
+_KEYWORD_LOCK = threading.Lock()
+
 DEFAULT_STATE: Dict[str, Any] = {
     "step": 0,
     "tasks": [],
@@ -44,13 +81,14 @@ DEFAULT_STATE: Dict[str, Any] = {
 }
 
 
+@lru_cache(maxsize=256)  # planner queries recur across rounds
 def _format_query(raw: str) -> str:
     raw = (raw or "").strip()
     if not raw:
         return ""
     if ":" in raw:
         return raw
-    terms = [t for t in re.split(r"\s+", raw) if t]
+    terms = raw.split()
     if not terms:
         return raw
     return " AND ".join(f"all:{term}" for term in terms)
@@ -78,8 +116,6 @@ def _download_and_chunk(paper: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Li
     if not pdf_local and paper.get("url"):
         html = fetch_html(paper["url"])
         if html:
-            from .tools import discover_pdf_url
-
             alt_pdf = discover_pdf_url(html, paper["url"])
             if alt_pdf:
                 pdf_local = download_file(alt_pdf, paper_id=paper_id, kind="pdf")
@@ -125,14 +161,49 @@ def _download_and_chunk(paper: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Li
     return combined, warnings
 
 
-def _index_chunks(session_id: str, chunks: List[Dict[str, Any]], store: VectorStore) -> List[str]:
-    texts = [c.get("text", "") for c in chunks]
-    if not any(texts):
+def _text_fingerprint(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _embeddable(chunks: List[Dict[str, Any]], indexed: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Chunks that still need embedding.
+
+    Blank chunks are dropped (embed_texts drops them too, which would misalign its
+    output). Chunks already indexed in this session with the same text, per the
+    ``embedded_hash`` kept in ``state["chunks"]``, are skipped and keep their marker.
+    """
+    pending = []
+    for chunk in chunks:
+        text = chunk.get("text") or ""
+        if not text.strip():
+            continue
+        fingerprint = _text_fingerprint(text)
+        if (indexed.get(chunk["id"]) or {}).get("embedded_hash") == fingerprint:
+            chunk["embedded_hash"] = fingerprint
+            continue
+        pending.append(chunk)
+    return pending
+
+
+def _embed_chunk_batch(chunks: List[Dict[str, Any]]) -> List[Sequence[float]]:
+    """One embedding call for chunks from any number of papers (pre-filtered by _embeddable).
+
+    Identical texts (shared boilerplate across PDFs) are embedded once and the vector is
+    reused for every chunk carrying them.
+    """
+    if not chunks:
         return []
-    try:
-        embeddings = embed_texts(texts)
-    except Exception as exc:
-        return [f"embedding_failed:{exc}"]
+    unique = list(dict.fromkeys(c["text"] for c in chunks))
+    vectors = dict(zip(unique, embed_texts(unique)))
+    return [vectors[c["text"]] for c in chunks]
+
+
+def _upsert_chunks(
+    session_id: str,
+    chunks: List[Dict[str, Any]],
+    embeddings: Sequence[Sequence[float]],
+    store: VectorStore,
+) -> None:
     records = []
     for chunk, emb in zip(chunks, embeddings):
         records.append(
@@ -149,7 +220,6 @@ def _index_chunks(session_id: str, chunks: List[Dict[str, Any]], store: VectorSt
             }
         )
     store.upsert(session_id, records)
-    return []
 
 
 def run_planner_session(topic: str, session_id: str, *, max_rounds: int = 6, search_limit: int = 8) -> Dict[str, Any]:
@@ -157,6 +227,20 @@ def run_planner_session(topic: str, session_id: str, *, max_rounds: int = 6, sea
     state_path = session_state_path(session_id)
     is_new_session = not state_path.exists()
     state = load_json_default(state_path, DEFAULT_STATE)
+    if is_new_session:
+        session_history_path(session_id).unlink(missing_ok=True)
+    elif "history" in state:
+        # Checkpoint from before the history side log: migrate it once
+        if not session_history_path(session_id).exists():
+            for entry in state["history"]:
+                append_session_history(session_id, entry)
+    else:
+        # Entries past the last checkpoint belong to rounds whose state was lost; drop them
+        # so the replayed rounds do not append duplicates
+        history = load_session_history(session_id)
+        state["history"] = [h for h in history if h.get("step", 0) <= state.get("step", 0)]
+        if len(state["history"]) != len(history):
+            jsonl_write(session_history_path(session_id), state["history"])
     state.setdefault("topic", topic)
     state.setdefault("papers", {})
     state.setdefault("queries", [])
@@ -185,20 +269,23 @@ def run_planner_session(topic: str, session_id: str, *, max_rounds: int = 6, sea
         )
 
         state.setdefault("warnings", []).extend(warnings)
-        state.setdefault("history", []).append(
-            {
-                "step": state["step"],
-                "action": action,
-                "result": exec_result,
-                "planner_payload": raw_payload,
-                "timestamp": int(time.time()),
-            }
-        )
-        save_session_state(session_id, state)
+        entry = {
+            "step": state["step"],
+            "action": action,
+            "result": exec_result,
+            "planner_payload": raw_payload,
+            "timestamp": int(time.time()),
+        }
+        state.setdefault("history", []).append(entry)
+        append_session_history(session_id, entry)
         observation = exec_result
 
         if action["action"] == "finish":
             break
+        if state["step"] % CHECKPOINT_EVERY == 0:
+            save_session_state(session_id, state)
+
+    save_session_state(session_id, state)
 
     note = _build_note(state, topic, session_id)
     json_write(session_path(session_id), note)
@@ -221,6 +308,7 @@ def _execute_action(
     if kind == "summarize":
         return _do_summarize(action, state, store, session_id)
     if kind == "finish":
+        _invalidate_answers(session_id)
         return action.get("notes", "Planner decided to finish."), []
     return f"Unsupported action {kind}", [f"unsupported_action:{kind}"]
 
@@ -230,7 +318,10 @@ def _do_search(action: Dict[str, Any], state: Dict[str, Any], search_limit: int)
     if not isinstance(queries, list) or not queries:
         return "Planner requested search but provided no queries."
 
-    all_results: List[Dict[str, Any]] = []
+    # formatted query -> {"paper_ids", "limit", "fetched_at"} for searches already run this session
+    query_cache = state.setdefault("query_cache", {})
+    now = int(time.time())
+    formatted_queries: List[str] = []
     for q in queries:
         if isinstance(q, dict):
             query_text = q.get("q") or q.get("query") or ""
@@ -240,13 +331,38 @@ def _do_search(action: Dict[str, Any], state: Dict[str, Any], search_limit: int)
         if not formatted:
             continue
         state.setdefault("queries", []).append({"raw": query_text, "formatted": formatted})
+        formatted_queries.append(formatted)
+
+    def run(formatted: str) -> Any:
         try:
-            results = search_arxiv(formatted, max_results=search_limit)
+            return search_arxiv(formatted, max_results=search_limit)
         except Exception as exc:
-            all_results.append({"id": "error", "title": f"search failed: {exc}"})
+            return exc
+
+    # Queries go out concurrently over the shared keep-alive pool; results are merged in order.
+    # Repeats of a recent query run with at least this limit are replayed from state instead.
+    to_run = list(dict.fromkeys(f for f in formatted_queries if not _cached_search(query_cache, f, search_limit, now)))
+    fresh: Dict[str, Any] = {}
+    if to_run:
+        with ThreadPoolExecutor(max_workers=min(len(to_run), SEARCH_CONCURRENCY)) as pool:
+            fresh = dict(zip(to_run, pool.map(run, to_run)))
+
+    all_results: List[Dict[str, Any]] = []
+    papers = state.setdefault("papers", {})
+    for formatted in formatted_queries:
+        results = fresh.get(formatted)
+        if results is None:
+            entry = query_cache[formatted]
+            replayed = [papers[pid] for pid in entry["paper_ids"][:search_limit] if pid in papers]
+            all_results.extend({k: v for k, v in paper.items() if k != "status"} for paper in replayed)
+            continue
+        if isinstance(results, Exception):
+            all_results.append({"id": "error", "title": f"search failed: {results}"})
             continue
+        del fresh[formatted]  # later repeats in this action replay from the cache
+        query_cache[formatted] = {"paper_ids": [p["id"] for p in results], "limit": search_limit, "fetched_at": now}
+        jsonl_append_many(papers_jsonl(), results)
         for paper in results:
-            jsonl_append(papers_jsonl(), paper)
             state.setdefault("papers", {})[paper["id"]] = {
                 **paper,
                 "status": state["papers"].get(paper["id"], {}).get("status", "discovered"),
@@ -257,6 +373,15 @@ def _do_search(action: Dict[str, Any], state: Dict[str, Any], search_limit: int)
     return f"Search completed. Notes: {action.get('notes', '')}\n{summary}"
 
 
+def _cached_search(query_cache: Dict[str, Any], formatted: str, search_limit: int, now: int) -> bool:
+    entry = query_cache.get(formatted)
+    return (
+        entry is not None
+        and entry.get("limit", 0) >= search_limit
+        and now - entry.get("fetched_at", 0) < SEARCH_CACHE_MAX_AGE
+    )
+
+
 def _do_read(
     action: Dict[str, Any],
     state: Dict[str, Any],
@@ -270,22 +395,52 @@ def _do_read(
     warnings: List[str] = []
     lines: List[str] = []
 
-    for pid in paper_ids:
-        pid = str(pid)
-        paper = state.get("papers", {}).get(pid)
-        if not paper:
+    # Download/parse all papers concurrently (repeated ids share one download), then
+    # embed their chunks in one call; results are consumed in request order
+    papers = state.get("papers", {})
+    pids = [str(pid) for pid in paper_ids]
+    known = list(dict.fromkeys(pid for pid in pids if papers.get(pid)))
+    downloads: Dict[str, Any] = {}
+    if known:
+        with ThreadPoolExecutor(max_workers=min(len(known), MAX_DOWNLOAD_WORKERS)) as pool:
+            downloads = {pid: pool.submit(_download_and_chunk, papers[pid]) for pid in known}
+
+    fetched: List[Tuple[str, List[Dict[str, Any]]]] = []
+    for pid in pids:
+        if pid not in downloads:
             warnings.append(f"unknown_paper:{pid}")
             continue
-        chunks, chunk_warnings = _download_and_chunk(paper)
+        chunks, chunk_warnings = downloads[pid].result()
         warnings.extend(chunk_warnings)
+        fetched.append((pid, chunks))
+
+    chunk_store = state.setdefault("chunks", {})
+    per_paper = [_embeddable(chunks, chunk_store) for _, chunks in fetched]
+    embed_error: Optional[Exception] = None
+    embeddings: List[Sequence[float]] = []
+    try:
+        embeddings = _embed_chunk_batch([c for batch in per_paper for c in batch])
+    except Exception as exc:
+        embed_error = exc
+
+    cursor = 0
+    for (pid, chunks), embeddable in zip(fetched, per_paper):
         if not chunks:
             lines.append(f"{pid}: no chunks available")
             continue
-        chunk_warn = _index_chunks(session_id, chunks, store)
-        warnings.extend(chunk_warn)
-        chunk_store = state.setdefault("chunks", {})
+        if embeddable:
+            if embed_error is not None:
+                warnings.append(f"embedding_failed:{embed_error}")
+            else:
+                _upsert_chunks(session_id, embeddable, embeddings[cursor : cursor + len(embeddable)], store)
+                cursor += len(embeddable)
+                _invalidate_answers(session_id)
+                for chunk in embeddable:
+                    chunk["embedded_hash"] = _text_fingerprint(chunk["text"])
         for chunk in chunks:
-            chunk_store[chunk["id"]] = chunk
+            chunk_store[chunk["id"]] = _slim_chunk(chunk)
+        with _KEYWORD_LOCK:
+            _KEYWORD_INDEXES.pop(session_id, None)
         paper_meta = state["papers"][pid]
         paper_meta["status"] = "read"
         paper_meta["notes"] = action.get("notes", "")
@@ -316,10 +471,13 @@ def _do_summarize(
     findings = state.setdefault("findings", [])
     lines: List[str] = []
 
-    for question in focus_items:
-        question_text = str(question).strip()
-        if not question_text:
-            continue
+    questions = [text for text in (str(q).strip() for q in focus_items) if text]
+    try:
+        embed_questions(questions)  # one request; retrieval below reads the cached vectors
+    except Exception:
+        pass  # each question retries on its own and falls back to keywords
+
+    for question_text in questions:
         vector_hits = []
         try:
             mm = MemoryManager()
@@ -328,8 +486,7 @@ def _do_summarize(
         except Exception:
             vector_hits = []
         if not vector_hits:
-            cache = list(state.get("chunks", {}).values())
-            fallback_hits = keyword_retrieve(cache, question_text, top_n=4)
+            fallback_hits = _keyword_index(session_id, state).query(question_text, top_n=4)
             vector_hits = [
                 {
                     "chunk_id": ch.get("id"),
@@ -344,7 +501,7 @@ def _do_summarize(
                 }
                 for ch in fallback_hits
             ]
-        answer = _llm_answer(question_text, vector_hits)
+        answer = _cached_answer(session_id, question_text, vector_hits)
         citations_clean = [
             {
                 "paper_id": hit.get("paper_id"),
@@ -368,11 +525,107 @@ def _do_summarize(
     return summary, []
 
 
+def _cached_answer(session_id: str, question: str, hits: List[Dict[str, Any]]) -> str:
+    """_llm_answer behind a per-session cache keyed on the evidence chunk set.
+
+    A cached answer is reused when the same chunks were retrieved and the question is
+    identical or (cosine >= ANSWER_CACHE_MIN_SIM) a near-duplicate. The question is only
+    embedded when a differently-worded candidate exists for that evidence.
+    """
+    if not hits:
+        return _llm_answer(question, hits)
+    key = (session_id, tuple(sorted(str(h.get("chunk_id")) for h in hits)))
+    now = time.monotonic()
+    embedding: Optional[Sequence[float]] = None
+    with _ANSWER_LOCK:
+        entries = [e for e in _ANSWER_CACHE.get(key, []) if now - e[3] <= ANSWER_CACHE_TTL]
+    for cached_question, _, answer, _ in entries:
+        if cached_question == question:
+            _touch_answers(key)
+            return answer
+    if entries:
+        try:
+            embedding = embed_question(question)
+        except Exception:
+            embedding = None
+        if embedding:
+            for _, cached_embedding, answer, _ in entries:
+                if cached_embedding and _cosine(embedding, cached_embedding) >= ANSWER_CACHE_MIN_SIM:
+                    _touch_answers(key)
+                    return answer
+
+    answer = _llm_answer(question, hits)
+    if embedding is None:
+        try:
+            embedding = embed_question(question)
+        except Exception:
+            embedding = None
+    with _ANSWER_LOCK:
+        _ANSWER_CACHE[key] = entries + [(question, embedding, answer, now)]
+        _ANSWER_CACHE.move_to_end(key)
+        while len(_ANSWER_CACHE) > ANSWER_CACHE_SIZE:
+            _ANSWER_CACHE.popitem(last=False)
+    return answer
+
+
+def _touch_answers(key: Tuple[str, Tuple[str, ...]]) -> None:
+    with _ANSWER_LOCK:
+        if key in _ANSWER_CACHE:
+            _ANSWER_CACHE.move_to_end(key)
+
+
+def _slim_chunk(chunk: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in chunk.items() if k not in _CHUNK_TEXT_FIELDS}
+
+
+def _hydrate_chunks(chunks: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Session chunks with their text reloaded from the chunk files, in state order."""
+    paper_ids = {c.get("paper_id") for c in chunks.values() if "text" not in c}
+    texts: Dict[str, Any] = {}
+    for paper_id in paper_ids:
+        path = chunks_path(paper_id) if paper_id else None
+        if path is not None and path.exists():
+            for full in jsonl_read(path):
+                if full.get("id") in chunks:
+                    texts[full["id"]] = full.get("text")
+    return [c if "text" in c else {**c, "text": texts.get(c["id"]) or ""} for c in chunks.values()]
+
+
+def _keyword_index(session_id: str, state: Dict[str, Any]) -> KeywordIndex:
+    """Inverted index over the session's chunks, reused across summarize calls."""
+    chunks = state.get("chunks", {})
+    with _KEYWORD_LOCK:
+        cached = _KEYWORD_INDEXES.get(session_id)
+        if cached is not None and cached[0] == len(chunks):
+            _KEYWORD_INDEXES.move_to_end(session_id)
+            return cached[1]
+    index = KeywordIndex(_hydrate_chunks(chunks))
+    with _KEYWORD_LOCK:
+        _KEYWORD_INDEXES[session_id] = (len(chunks), index)
+        _KEYWORD_INDEXES.move_to_end(session_id)
+        while len(_KEYWORD_INDEXES) > KEYWORD_INDEX_CACHE_SIZE:
+            _KEYWORD_INDEXES.popitem(last=False)
+    return index
+
+
+def _invalidate_answers(session_id: str) -> None:
+    with _ANSWER_LOCK:
+        for key in [k for k in _ANSWER_CACHE if k[0] == session_id]:
+            del _ANSWER_CACHE[key]
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    if len(a) != len(b):
+        return -1.0
+    denom = math.hypot(*a) * math.hypot(*b)
+    return sum(map(operator.mul, a, b)) / denom if denom else -1.0
+
+
 def _llm_answer(question: str, hits: List[Dict[str, Any]]) -> str:
     if not hits:
         return "Insufficient evidence collected yet."
     context = []
-    for hit in hits:
+    for hit in _dedupe_hits(hits):
         score = hit.get("score")
         label = ""
         try:
@@ -383,9 +636,7 @@ def _llm_answer(question: str, hits: List[Dict[str, Any]]) -> str:
         prefix = hit.get("paper_id") or "unknown"
         if label:
             prefix = f"{prefix} {label}"
-        context.append(f"[{prefix}] {hit.get('text', '')[:1200]}")
-    from .llm import call_llm
-
+        context.append(f"[{prefix}] {(hit.get('text') or '')[:EXCERPT_CHARS]}")
     messages = [
         {
             "role": "system",
@@ -407,20 +658,70 @@ def _llm_answer(question: str, hits: List[Dict[str, Any]]) -> str:
     return text.strip() or "No answer returned."
 
 
+def _dedupe_hits(hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop repeated chunks and near-identical excerpts from the same paper.
+
+    The best-scoring copy survives; survivors keep their original order.
+    """
+    def score_of(hit: Dict[str, Any]) -> float:
+        try:
+            return float(hit.get("score") or 0.0)
+        except (ValueError, TypeError):
+            return 0.0
+
+    kept: List[int] = []
+    seen_chunks = set()
+    signatures: Dict[Any, List[int]] = {}
+    for idx in sorted(range(len(hits)), key=lambda i: -score_of(hits[i])):
+        hit = hits[idx]
+        chunk_id = hit.get("chunk_id")
+        if chunk_id is not None:
+            if chunk_id in seen_chunks:
+                continue
+            seen_chunks.add(chunk_id)
+        signature = _simhash((hit.get("text") or "")[:EXCERPT_CHARS])
+        paper_sigs = signatures.setdefault(hit.get("paper_id"), [])
+        if any(bin(signature ^ other).count("1") <= NEAR_DUP_MAX_DISTANCE for other in paper_sigs):
+            continue
+        paper_sigs.append(signature)
+        kept.append(idx)
+    return [hits[i] for i in sorted(kept)]
+
+
+def _simhash(text: str, shingle: int = 5) -> int:
+    """64-bit simhash over word ``shingle``-grams."""
+    words = text.lower().split()
+    grams = [" ".join(words[i : i + shingle]) for i in range(max(len(words) - shingle + 1, 1))]
+    weights = [0] * 64
+    for gram in grams:
+        value = int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
 def _build_note(state: Dict[str, Any], topic: str, session_id: str) -> Dict[str, Any]:
     papers = state.get("papers", {})
-    reading_list = [
-        {"paper_id": pid, "reason": meta.get("status", "discovered")}
-        for pid, meta in papers.items()
+    history = state.get("history", [])
+    # Recent steps only, without the raw planner payload (the parsed action is kept)
+    history_steps = [
+        {k: v for k, v in step.items() if k != "planner_payload"}
+        for step in history[-MAX_HISTORY_IN_NOTE:]
     ]
+    paper_ids: List[str] = []
+    reading_list: List[Dict[str, Any]] = []
+    for pid, meta in papers.items():
+        paper_ids.append(pid)
+        reading_list.append({"paper_id": pid, "reason": meta.get("status", "discovered")})
     note = {
         "topic": topic,
         "session_id": session_id,
         "created_at": int(time.time()),
         "tasks": state.get("tasks", []),
         "queries": state.get("queries", []),
-        "papers": list(papers.keys()),
-        "history_steps": state.get("history", []),
+        "papers": paper_ids,
+        "history_steps": history_steps,
+        "history_total": len(history),
         "findings": state.get("findings", []),
         "reading_list": reading_list,
         "warnings": state.get("warnings", []),
@@ -11,39 +11,67 @@ Tests:
 """
 from __future__ import annotations
 
+import logging
+import queue
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 
 from paper_sailor.memory import MemoryManager
 from paper_sailor.vectorstore import VectorStore
-from paper_sailor.tools.retrieval import multimodal_retrieve
+from paper_sailor.tools.retrieval import embed_question, multimodal_retrieve
 from paper_sailor.tools.embeddings import embed_multimodal
 from paper_sailor.tools.search_arxiv import search_arxiv
 from paper_sailor.storage import ensure_dirs
 
+log = logging.getLogger(__name__)
+
+
+def _start_logging() -> QueueListener:
+    """Route log records through a queue so test threads never contend on stdout."""
+    records: queue.Queue = queue.Queue()
+    logging.basicConfig(level=logging.INFO, format="%(message)s", handlers=[QueueHandler(records)])
+    listener = QueueListener(records, logging.StreamHandler(sys.stdout))
+    listener.start()
+    return listener
+
+
+# One MemoryManager / VectorStore for the whole suite (both are safe to share across
+# the test threads); building them re-reads config and re-checks the SQLite schema
+@lru_cache(maxsize=1)
+def _mm() -> MemoryManager:
+    return MemoryManager()
+
+
+@lru_cache(maxsize=1)
+def _vs() -> VectorStore:
+    return VectorStore()
+
 
 def test_basic_memory_operations():
     """Test 1: Basic memory write and read operations."""
-    print("\n" + "=" * 80)
-    print("TEST 1: Basic Memory Operations")
-    print("=" * 80)
+    log.info("\n" + "=" * 80)
+    log.info("TEST 1: Basic Memory Operations")
+    log.info("=" * 80)
     
     try:
-        memory_manager = MemoryManager()
-        print("✅ Memory manager initialized")
+        memory_manager = _mm()
+        log.info("✅ Memory manager initialized")
         
         # Test user-level memory
-        print("\n📝 Testing user-level memory...")
+        log.info("\n📝 Testing user-level memory...")
         memory_manager.add_user_preference(
             user_id="test_user",
             preference="Interested in machine learning and NLP research"
         )
-        print("✅ User preference added")
+        log.info("✅ User preference added")
         
         # Test session-level memory
-        print("\n📝 Testing session-level memory...")
+        log.info("\n📝 Testing session-level memory...")
         memory_manager.add_session_context(
             session_id="test_session_001",
             context={
@@ -52,91 +80,75 @@ def test_basic_memory_operations():
                 "key_findings": ["Attention mechanisms are crucial"]
             }
         )
-        print("✅ Session context added")
+        log.info("✅ Session context added")
         
         # Test agent-level memory
-        print("\n📝 Testing agent-level memory...")
+        log.info("\n📝 Testing agent-level memory...")
         memory_manager.add_agent_knowledge(
             knowledge="Graph neural networks often use message passing algorithms"
         )
-        print("✅ Agent knowledge added")
+        log.info("✅ Agent knowledge added")
         
         return True, memory_manager
     except Exception as exc:
-        print(f"❌ Failed: {exc}")
-        import traceback
-        traceback.print_exc()
+        log.exception(f"❌ Failed: {exc}")
         return False, None
 
 
 def test_memory_search(memory_manager):
     """Test 2: Memory search and retrieval."""
-    print("\n" + "=" * 80)
-    print("TEST 2: Memory Search and Retrieval")
-    print("=" * 80)
+    log.info("\n" + "=" * 80)
+    log.info("TEST 2: Memory Search and Retrieval")
+    log.info("=" * 80)
     
     if not memory_manager:
-        print("⚠️  Skipping (no memory manager)")
+        log.info("⚠️  Skipping (no memory manager)")
         return False
     
     try:
-        # Search user memory
-        print("\n🔍 Searching user-level memory...")
-        user_results = memory_manager.search_memory(
-            query="machine learning",
-            level="user",
-            limit=5
-        )
-        print(f"✅ Found {len(user_results)} user memories")
-        if user_results:
-            print(f"   Sample: {user_results[0]}")
+        # Make sure the adds from test 1 have landed, so this checks write-then-read
+        memory_manager.flush()
         
-        # Search session memory
-        print("\n🔍 Searching session-level memory...")
-        session_results = memory_manager.search_memory(
-            query="Transformer",
-            level="session",
-            limit=5
-        )
-        print(f"✅ Found {len(session_results)} session memories")
-        if session_results:
-            print(f"   Sample: {session_results[0]}")
+        # The three levels are independent, so their searches run concurrently
+        searches = [
+            ("user", "machine learning"),
+            ("session", "Transformer"),
+            ("agent", "neural networks"),
+        ]
+        log.info("\n🔍 Searching user-, session- and agent-level memory...")
+        with ThreadPoolExecutor(max_workers=len(searches)) as pool:
+            found = list(pool.map(
+                lambda search: memory_manager.search_memory(query=search[1], level=search[0], limit=5),
+                searches,
+            ))
         
-        # Search agent memory
-        print("\n🔍 Searching agent-level memory...")
-        agent_results = memory_manager.search_memory(
-            query="neural networks",
-            level="agent",
-            limit=5
-        )
-        print(f"✅ Found {len(agent_results)} agent memories")
-        if agent_results:
-            print(f"   Sample: {agent_results[0]}")
+        for (level, _), results in zip(searches, found):
+            log.info(f"✅ Found {len(results)} {level} memories")
+            if results:
+                log.info(f"   Sample: {results[0]}")
         
         return True
     except Exception as exc:
-        print(f"❌ Failed: {exc}")
-        import traceback
-        traceback.print_exc()
+        log.exception(f"❌ Failed: {exc}")
         return False
 
 
 def test_memory_vector_integration():
     """Test 3: Integration between memory and vector store."""
-    print("\n" + "=" * 80)
-    print("TEST 3: Memory + Vector Store Integration")
-    print("=" * 80)
+    log.info("\n" + "=" * 80)
+    log.info("TEST 3: Memory + Vector Store Integration")
+    log.info("=" * 80)
     
     try:
         session_id = "integration_test_session"
-        memory_manager = MemoryManager()
-        vector_store = VectorStore()
+        memory_manager = _mm()
+        vector_store = _vs()
         
         # Clean up previous test data
         vector_store.delete_session(session_id)
         
         # Add some test data to vector store
-        print("\n📊 Adding test data to vector store...")
+        log.info("\n📊 Adding test data to vector store...")
         test_items = [
             {
                 "type": "text",
@@ -153,7 +165,7 @@ def test_memory_vector_integration():
         ]
         
         embeddings = embed_multimodal(test_items)
-        print(f"✅ Generated {len(embeddings)} embeddings")
+        log.info(f"✅ Generated {len(embeddings)} embeddings")
         
         records = []
         for i, (item, emb) in enumerate(zip(test_items, embeddings)):
@@ -168,19 +180,19 @@ def test_memory_vector_integration():
             })
         
         vector_store.upsert_multimodal(session_id, records)
-        print(f"✅ Stored {len(records)} records in vector store")
+        log.info(f"✅ Stored {len(records)} records in vector store")
         
         # Add corresponding memory context
-        print("\n📝 Adding memory context...")
+        log.info("\n📝 Adding memory context...")
         memory_manager.add_session_context(session_id, {
             "topic": "Transformer architecture analysis",
             "papers_indexed": ["test_paper_001"],
             "chunks_processed": len(records)
         })
-        print("✅ Memory context added")
+        log.info("✅ Memory context added")
         
         # Test multimodal retrieval with memory
-        print("\n🔍 Testing multimodal retrieval with memory...")
+        log.info("\n🔍 Testing multimodal retrieval with memory...")
         query = "What are the key components of Transformers?"
         results = multimodal_retrieve(
             session_id=session_id,
@@ -191,37 +203,42 @@ def test_memory_vector_integration():
             content_types=["text", "figure", "table"]
         )
         
-        print(f"✅ Retrieval completed:")
-        print(f"   - Text chunks: {len(results.get('text_chunks', []))}")
-        print(f"   - Figures: {len(results.get('figures', []))}")
-        print(f"   - Tables: {len(results.get('tables', []))}")
-        print(f"   - Memory context: {len(results.get('memory_context', []))}")
+        log.info(f"✅ Retrieval completed:")
+        log.info(f"   - Text chunks: {len(results.get('text_chunks', []))}")
+        log.info(f"   - Figures: {len(results.get('figures', []))}")
+        log.info(f"   - Tables: {len(results.get('tables', []))}")
+        log.info(f"   - Memory context: {len(results.get('memory_context', []))}")
         
         if results.get('memory_context'):
-            print(f"   - Memory recall: {results['memory_context'][0]}")
+            log.info(f"   - Memory recall: {results['memory_context'][0]}")
         
         return True
     except Exception as exc:
-        print(f"❌ Failed: {exc}")
-        import traceback
-        traceback.print_exc()
+        log.exception(f"❌ Failed: {exc}")
         return False
 
 
 def test_paper_sailor_workflow():
     """Test 4: Full Paper Sailor workflow with memory."""
-    print("\n" + "=" * 80)
-    print("TEST 4: Paper Sailor Workflow Integration")
-    print("=" * 80)
+    log.info("\n" + "=" * 80)
+    log.info("TEST 4: Paper Sailor Workflow Integration")
+    log.info("=" * 80)
     
     try:
         ensure_dirs()
         session_id = "workflow_mem0_test"
-        memory_manager = MemoryManager()
-        vector_store = VectorStore()
+        memory_manager = _mm()
+        vector_store = _vs()
+        
+        # The step 3 question is known up front, so its embedding request runs in the
+        # background while the papers are searched, embedded and stored
+        query = "What are the main findings about attention mechanisms?"
+        prefetch = ThreadPoolExecutor(max_workers=1)
+        query_embedding = prefetch.submit(embed_question, query)
+        prefetch.shutdown(wait=False)
         
         # Step 1: Search papers
-        print("\n🔍 Step 1: Searching papers...")
+        log.info("\n🔍 Step 1: Searching papers...")
         topic = "attention mechanisms in neural networks"
         
         memory_manager.add_session_context(session_id, {
@@ -232,64 +249,67 @@ def test_paper_sailor_workflow():
         
         try:
             papers = search_arxiv(topic, max_results=2)
-            print(f"✅ Found {len(papers)} papers")
+            log.info(f"✅ Found {len(papers)} papers")
             if papers:
-                print(f"   Sample: {papers[0].get('title', 'N/A')[:80]}...")
+                log.info(f"   Sample: {papers[0].get('title', 'N/A')[:80]}...")
             
             memory_manager.add_session_context(session_id, {
                 "papers_found": len(papers),
                 "paper_ids": [p.get('id') for p in papers[:2]]
             })
         except Exception as exc:
-            print(f"⚠️  Search skipped (network/API): {exc}")
+            log.info(f"⚠️  Search skipped (network/API): {exc}")
             papers = []
         
         # Step 2: Simulate paper processing
-        print("\n📄 Step 2: Processing papers...")
+        log.info("\n📄 Step 2: Processing papers...")
         if papers:
+            # Create synthetic chunks for every processed paper first
+            all_chunks = []
             for paper in papers[:1]:  # Process just first paper
                 paper_id = paper.get('id')
                 summary = paper.get('summary', '')
                 
                 if summary:
-                    # Create synthetic chunks
-                    chunks = [
-                        {
-                            "id": f"{paper_id}:chunk:0001",
-                            "paper_id": paper_id,
-                            "text": summary[:500],
-                            "content_type": "text"
-                        }
-                    ]
-                    
-                    # Embed and store
-                    items = [{"type": "text", "content": chunk["text"]} for chunk in chunks]
-                    embeddings = embed_multimodal(items)
-                    
-                    records = []
-                    for chunk, emb in zip(chunks, embeddings):
-                        records.append({
-                            "chunk_id": chunk["id"],
-                            "paper_id": chunk["paper_id"],
-                            "text": chunk["text"],
-                            "embedding": emb,
-                            "content_type": "text",
-                            "metadata": {}
-                        })
-                    
-                    vector_store.upsert_multimodal(session_id, records)
-                    print(f"✅ Processed {paper_id}: {len(records)} chunks")
-                    
-                    # Update memory
-                    memory_manager.add_session_context(session_id, {
-                        "workflow_step": "processing",
-                        "processed_paper": paper_id,
-                        "chunks_indexed": len(records)
+                    all_chunks.append({
+                        "id": f"{paper_id}:chunk:0001",
+                        "paper_id": paper_id,
+                        "text": summary[:500],
+                        "content_type": "text"
                     })
+            
+            # Embed all chunks in one request, then store them per paper
+            items = [{"type": "text", "content": chunk["text"]} for chunk in all_chunks]
+            embeddings = embed_multimodal(items) if items else []
+            
+            records_by_paper = {}
+            for chunk, emb in zip(all_chunks, embeddings):
+                records_by_paper.setdefault(chunk["paper_id"], []).append({
+                    "chunk_id": chunk["id"],
+                    "paper_id": chunk["paper_id"],
+                    "text": chunk["text"],
+                    "embedding": emb,
+                    "content_type": "text",
+                    "metadata": {}
+                })
+            
+            for paper_id, records in records_by_paper.items():
+                vector_store.upsert_multimodal(session_id, records)
+                log.info(f"✅ Processed {paper_id}: {len(records)} chunks")
+                
+                # Update memory
+                memory_manager.add_session_context(session_id, {
+                    "workflow_step": "processing",
+                    "processed_paper": paper_id,
+                    "chunks_indexed": len(records)
+                })
         
         # Step 3: Query and retrieve with memory
-        print("\n🔍 Step 3: Querying with memory context...")
-        query = "What are the main findings about attention mechanisms?"
+        log.info("\n🔍 Step 3: Querying with memory context...")
+        try:
+            query_embedding.result()
+        except Exception:
+            pass  # multimodal_retrieve embeds the question itself and reports the error
         
         results = multimodal_retrieve(
             session_id=session_id,
@@ -299,46 +319,44 @@ def test_paper_sailor_workflow():
             top_n=3
         )
         
-        print(f"✅ Query results:")
-        print(f"   - Text chunks: {len(results.get('text_chunks', []))}")
-        print(f"   - Memory context items: {len(results.get('memory_context', []))}")
+        log.info(f"✅ Query results:")
+        log.info(f"   - Text chunks: {len(results.get('text_chunks', []))}")
+        log.info(f"   - Memory context items: {len(results.get('memory_context', []))}")
         
         # Step 4: Add findings to memory
-        print("\n📝 Step 4: Storing findings in memory...")
+        log.info("\n📝 Step 4: Storing findings in memory...")
         memory_manager.add_agent_knowledge(
             f"Research on '{topic}' shows that attention mechanisms improve model performance"
         )
-        print("✅ Findings stored in agent memory")
+        log.info("✅ Findings stored in agent memory")
         
         # Step 5: Verify memory persistence
-        print("\n🔍 Step 5: Verifying memory persistence...")
+        log.info("\n🔍 Step 5: Verifying memory persistence...")
         recall = memory_manager.search_memory(
             query="attention mechanisms",
             level="session",
             limit=5
         )
-        print(f"✅ Recalled {len(recall)} memory items from session")
+        log.info(f"✅ Recalled {len(recall)} memory items from session")
         
         return True
     except Exception as exc:
-        print(f"❌ Failed: {exc}")
-        import traceback
-        traceback.print_exc()
+        log.exception(f"❌ Failed: {exc}")
         return False
 
 
 def test_memory_context_enrichment():
     """Test 5: Memory-enriched retrieval."""
-    print("\n" + "=" * 80)
-    print("TEST 5: Memory Context Enrichment")
-    print("=" * 80)
+    log.info("\n" + "=" * 80)
+    log.info("TEST 5: Memory Context Enrichment")
+    log.info("=" * 80)
     
     try:
         session_id = "enrichment_test"
-        memory_manager = MemoryManager()
+        memory_manager = _mm()
         
         # Add rich context to memory
-        print("\n📝 Adding rich research context...")
+        log.info("\n📝 Adding rich research context...")
         memory_manager.add_session_context(session_id, {
             "research_area": "Deep Learning",
             "focus_topics": ["attention", "transformers", "self-attention"],
@@ -349,82 +367,94 @@ def test_memory_context_enrichment():
                 "Positional encoding is crucial for sequence modeling"
             ]
         })
-        print("✅ Rich context added")
+        log.info("✅ Rich context added")
         
         # Test context retrieval
-        print("\n🔍 Testing context retrieval...")
+        log.info("\n🔍 Testing context retrieval...")
         context = memory_manager.get_relevant_context(
             session_id=session_id,
             question="How does attention work in transformers?"
         )
-        print(f"✅ Retrieved context: {len(context)} characters")
+        log.info(f"✅ Retrieved context: {len(context)} characters")
         if context:
-            print(f"   Preview: {context[:150]}...")
+            log.info(f"   Preview: {context[:150]}...")
         
         return True
     except Exception as exc:
-        print(f"❌ Failed: {exc}")
-        import traceback
-        traceback.print_exc()
+        log.exception(f"❌ Failed: {exc}")
         return False
 
 
 def main():
     """Run all MEM0 integration tests."""
-    print("=" * 80)
-    print("MEM0 Integration Test Suite")
-    print("=" * 80)
-    print("\nTesting MEM0 memory system integration with Paper Sailor")
-    print("This validates:")
-    print("  - Memory write/read operations")
-    print("  - Multi-level memory (user/session/agent)")
-    print("  - Integration with vector store")
-    print("  - Integration with Paper Sailor workflow")
+    log.info("=" * 80)
+    log.info("MEM0 Integration Test Suite")
+    log.info("=" * 80)
+    log.info("\nTesting MEM0 memory system integration with Paper Sailor")
+    log.info("This validates:")
+    log.info("  - Memory write/read operations")
+    log.info("  - Multi-level memory (user/session/agent)")
+    log.info("  - Integration with vector store")
+    log.info("  - Integration with Paper Sailor workflow")
     
     results = {}
     
-    # Test 1: Basic operations
-    success, memory_manager = test_basic_memory_operations()
-    results["basic_operations"] = success
+    def run_memory_tests():
+        # Test 1: Basic operations; Test 2: Memory search reuses its manager
+        success, memory_manager = test_basic_memory_operations()
+        searched = test_memory_search(memory_manager) if memory_manager else False
+        return success, searched
     
-    # Test 2: Memory search
-    if memory_manager:
-        results["memory_search"] = test_memory_search(memory_manager)
+    # Tests 3-5 use their own session ids and mostly wait on the network, so they run
+    # alongside tests 1-2 unless --serial is given (handy when reading the output)
+    if "--serial" in sys.argv[1:]:
+        memory = run_memory_tests()
+        vector = test_memory_vector_integration()
+        workflow = test_paper_sailor_workflow()
+        enrichment = test_memory_context_enrichment()
     else:
-        results["memory_search"] = False
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            memory_future = pool.submit(run_memory_tests)
+            vector_future = pool.submit(test_memory_vector_integration)
+            workflow_future = pool.submit(test_paper_sailor_workflow)
+            enrichment_future = pool.submit(test_memory_context_enrichment)
+            memory = memory_future.result()
+            vector = vector_future.result()
+            workflow = workflow_future.result()
+            enrichment = enrichment_future.result()
     
-    # Test 3: Vector store integration
-    results["vector_integration"] = test_memory_vector_integration()
-    
-    # Test 4: Full workflow
-    results["workflow_integration"] = test_paper_sailor_workflow()
-    
-    # Test 5: Context enrichment
-    results["context_enrichment"] = test_memory_context_enrichment()
+    results["basic_operations"], results["memory_search"] = memory
+    results["vector_integration"] = vector
+    results["workflow_integration"] = workflow
+    results["context_enrichment"] = enrichment
     
     # Summary
-    print("\n" + "=" * 80)
-    print("TEST SUMMARY")
-    print("=" * 80)
+    log.info("\n" + "=" * 80)
+    log.info("TEST SUMMARY")
+    log.info("=" * 80)
     
     for test_name, passed in results.items():
         status = "✅ PASS" if passed else "❌ FAIL"
-        print(f"{status}: {test_name}")
+        log.info(f"{status}: {test_name}")
     
     total = len(results)
     passed = sum(results.values())
     
-    print(f"\nTotal: {passed}/{total} tests passed")
+    log.info(f"\nTotal: {passed}/{total} tests passed")
     
     if passed == total:
-        print("\n🎉 All tests passed! MEM0 integration is working correctly.")
+        log.info("\n🎉 All tests passed! MEM0 integration is working correctly.")
         return True
     else:
-        print(f"\n⚠️  {total - passed} test(s) failed. Please review the output above.")
+        log.info(f"\n⚠️  {total - passed} test(s) failed. Please review the output above.")
         return False
 
 
 if __name__ == "__main__":
-    success = main()
+    listener = _start_logging()
+    try:
+        success = main()
+    finally:
+        listener.stop()
     sys.exit(0 if success else 1)
 
@@ -4,18 +4,35 @@ Test parallel vision API with a PDF that likely has figures.
 """
 from __future__ import annotations
 
+import os
+import logging
+import queue
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 
 from paper_sailor.tools.multimodal_parser import extract_figures_and_tables
 
+log = logging.getLogger(__name__)
+
+
+def _start_logging() -> QueueListener:
+    """Route log records through a queue so test threads never contend on stdout."""
+    records: queue.Queue = queue.Queue()
+    logging.basicConfig(level=logging.INFO, format="%(message)s", handlers=[QueueHandler(records)])
+    listener = QueueListener(records, logging.StreamHandler(sys.stdout))
+    listener.start()
+    return listener
+
 
 def main():
-    print("=" * 80)
-    print("Parallel Vision API Test")
-    print("=" * 80)
+    log.info("=" * 80)
+    log.info("Parallel Vision API Test")
+    log.info("=" * 80)
     
     # Try multiple PDFs to find ones with figures
     test_pdfs = [
@@ -26,51 +43,71 @@ def main():
         "data/pdfs/arxiv:2510.11709v1.pdf",
     ]
     
-    for pdf_name in test_pdfs:
-        pdf_path = Path(pdf_name)
-        if not pdf_path.exists():
-            continue
-        
-        paper_id = pdf_path.stem
-        print(f"\n{'='*80}")
-        print(f"Testing: {pdf_path.name}")
-        print(f"{'='*80}")
-        
-        try:
-            # Extract with parallel processing
-            results = extract_figures_and_tables(
-                str(pdf_path),
-                paper_id,
-                verbose=True,
-                max_pages=5,  # First 5 pages
-                extract_tables=False,  # Only figures
-                max_workers=6  # 6 parallel workers
-            )
+    # One directory scan instead of a stat per candidate
+    pdf_dir = Path("data/pdfs")
+    try:
+        with os.scandir(pdf_dir) as entries:
+            available = {entry.name for entry in entries}
+    except FileNotFoundError:
+        available = set()
+    pdf_paths = [Path(name) for name in test_pdfs if Path(name).name in available]
+    if not pdf_paths:
+        log.info("\n⚠️  None of the test PDFs are present under data/pdfs")
+        return False
+    
+    def extract(pdf_path):
+        log.info(f"\n▶️  Testing: {pdf_path.name}")
+        # Extract with parallel processing; the PDFs themselves also run concurrently
+        return extract_figures_and_tables(
+            str(pdf_path),
+            pdf_path.stem,
+            verbose=True,
+            max_pages=5,  # First 5 pages
+            extract_tables=False,  # Only figures
+            max_workers=2,  # 2 parallel workers per PDF
+            cancel=found,  # skip the remaining vision calls once any PDF has figures
+        )
+    
+    # Vision calls are I/O-bound, so every PDF is extracted at once and the first one
+    # with figures wins; the others stop issuing vision calls when ``found`` is set
+    found = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=len(pdf_paths))
+    futures = {pool.submit(extract, pdf_path): pdf_path for pdf_path in pdf_paths}
+    try:
+        for future in as_completed(futures):
+            pdf_path = futures[future]
+            try:
+                results = future.result()
+            except Exception as exc:
+                log.exception(f"❌ Error in {pdf_path.name}: {exc}")
+                continue
             
             if results:
-                print(f"\n✅ SUCCESS: Found {len(results)} figures")
-                print(f"\nSample descriptions:")
+                found.set()
+                log.info(f"\n✅ SUCCESS: Found {len(results)} figures in {pdf_path.name}")
+                log.info(f"\nSample descriptions:")
                 for i, item in enumerate(results[:3], 1):
                     desc = item.get("visual_description", "N/A")
-                    print(f"{i}. Page {item.get('page_from')}: {desc[:100]}...")
+                    log.info(f"{i}. Page {item.get('page_from')}: {desc[:100]}...")
                 
                 # We found a PDF with figures, stop here
                 return True
             else:
-                print(f"⏭️  No figures found in first 5 pages, trying next PDF...")
-        
-        except Exception as exc:
-            print(f"❌ Error: {exc}")
-            import traceback
-            traceback.print_exc()
+                log.info(f"⏭️  No figures found in first 5 pages of {pdf_path.name}, waiting for the others...")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
     
-    print("\n" + "=" * 80)
-    print("⚠️  None of the test PDFs had figures in the first 5 pages")
-    print("=" * 80)
+    log.info("\n" + "=" * 80)
+    log.info("⚠️  None of the test PDFs had figures in the first 5 pages")
+    log.info("=" * 80)
     return False
 
 
 if __name__ == "__main__":
-    success = main()
+    listener = _start_logging()
+    try:
+        success = main()
+    finally:
+        listener.stop()
     sys.exit(0 if success else 1)
 
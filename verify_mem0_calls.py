@@ -27,35 +27,35 @@ if not memory.use_mem0:
 
 print(f"✅ MEM0 SDK initialized: {type(memory.mem0_client)}")
 
-# Test 1: Add user preference
-print("\n2️⃣  Adding user preference...")
-memory.add_user_preference(
-    user_id="test_user_verify",
-    preference="I am interested in deep learning and computer vision research"
-)
+# Tests 1-3: Add user preference, session context and agent knowledge in one batch
+print("\n2️⃣  Adding user preference, session context and agent knowledge...")
+memory.add_many([
+    {
+        "level": "user",
+        "user_id": "test_user_verify",
+        "preference": "I am interested in deep learning and computer vision research"
+    },
+    {
+        "level": "session",
+        "session_id": "verify_session_001",
+        "context": {
+            "topic": "Transformer architectures for NLP",
+            "papers_reviewed": ["arxiv:1706.03762"],
+            "timestamp": "2025-11-09"
+        }
+    },
+    {
+        "level": "agent",
+        "knowledge": "Self-attention mechanisms allow models to weigh the importance of different parts of the input"
+    },
+])
+memory.flush()
 print("✅ Check dashboard for: user_id='test_user_verify'")
-
-# Test 2: Add session context
-print("\n3️⃣  Adding session context...")
-memory.add_session_context(
-    session_id="verify_session_001",
-    context={
-        "topic": "Transformer architectures for NLP",
-        "papers_reviewed": ["arxiv:1706.03762"],
-        "timestamp": "2025-11-09"
-    }
-)
 print("✅ Check dashboard for: user_id='session_verify_session_001'")
-
-# Test 3: Add agent knowledge  
-print("\n4️⃣  Adding agent knowledge...")
-memory.add_agent_knowledge(
-    "Self-attention mechanisms allow models to weigh the importance of different parts of the input"
-)
 print("✅ Check dashboard for: user_id='agent_global'")
 
 # Test 4: Search memories
-print("\n5️⃣  Searching memories...")
+print("\n3️⃣  Searching memories...")
 try:
     results = memory.search_memory(
         query="deep learning",